@@ -5,17 +5,14 @@ This DAG uses the CDC Python operator to process tables based on global configur
 """
 
 import os
-import sys
-import json
 from datetime import timedelta, datetime
 
 from airflow import DAG
+from airflow.decorators import task
 from airflow.operators.python import PythonOperator
-from airflow.operators.bash import BashOperator
 
-# Import CDC modules - assuming the project is mounted at /opt/airflow
-sys.path.append('/opt/airflow')
-from scripts.run_cdc import run_cdc, load_config
+# CDC modules are importable because the project is installed (or on PYTHONPATH)
+from scripts.run_cdc import run_cdc, load_config, read_config
 
 # Default DAG arguments
 default_args = {
@@ -32,8 +29,8 @@ config_path = os.getenv('CDC_CONFIG_PATH', '/opt/airflow/config.json')
 
 # Load the configuration
 try:
-    with open(config_path, 'r') as f:
-        config = json.load(f)
+    # Parsed once per config revision and shared with the task callables below
+    config = read_config(config_path)
     
     # Get scheduling parameters from config
     scheduling = config.get('global_settings', {}).get('scheduling', {})
@@ -67,18 +64,29 @@ dag = DAG(
     is_paused_upon_creation=not enabled,
 )
 
-# Task to check if config exists
-check_config = BashOperator(
-    task_id='check_config',
-    bash_command=f'test -f {config_path} || (echo "Config file not found at {config_path}" && exit 1)',
-    dag=dag,
-)
+# Task to check if config exists - runs in-process instead of forking a shell
+@task(dag=dag, task_id='check_config')
+def check_config_file():
+    """Fail the run early if the config file is missing."""
+    if not os.path.isfile(config_path):
+        raise FileNotFoundError(f"Config file not found at {config_path}")
+
+check_config = check_config_file()
+
+def run_timestamp(logical_date):
+    """Snapshot timestamp of a DAG run: its logical date as naive local time.
+    
+    Every task of a run, mapped table tasks included, derives the same
+    value, so the run's snapshots group together. Naive local time
+    matches the timestamps `run_cdc` takes outside Airflow.
+    """
+    return datetime.fromtimestamp(logical_date.timestamp())
 
 # Function to run CDC process for all tables
 def process_all_tables(**kwargs):
     """Process all tables defined in the configuration."""
     config = load_config(config_path)
-    run_cdc(config_path, config)
+    run_cdc(config_path, config, run_ts=run_timestamp(kwargs['logical_date']))
     return "CDC processing completed for all tables"
 
 # Create a task to process all tables
@@ -88,26 +96,28 @@ process_all = PythonOperator(
     dag=dag,
 )
 
+# Parse the config once per DAG run and publish the table list for mapping
+@task(dag=dag)
+def pre_process():
+    """Resolve the tables to process from the configuration."""
+    config = read_config(config_path)
+    return list(config.get('tables', {}))
+
 # Function to run CDC process for a specific table
-def process_table(table_name, **kwargs):
+@task(dag=dag)
+def process_table(table_name, logical_date=None):
     """Process a specific table."""
+    # Served from the per-process cache filled when this file was parsed
     config = load_config(config_path)
-    run_cdc(config_path, config, [table_name])
+    run_cdc(config_path, config, [table_name], run_ts=run_timestamp(logical_date))
     return f"CDC processing completed for table {table_name}"
 
-# Create individual tasks for each table
-try:
-    for table_name in config.get('tables', {}):
-        table_task = PythonOperator(
-            task_id=f'process_table_{table_name}',
-            python_callable=process_table,
-            op_kwargs={'table_name': table_name},
-            dag=dag,
-        )
-        # Set dependency: check_config -> individual table task
-        check_config >> table_task
-except Exception as e:
-    print(f"Error creating table tasks: {e}")
+# Map one task instance per configured table instead of one operator per table
+table_names = pre_process()
+process_tables = process_table.expand(table_name=table_names)
+
+# Set dependency: check_config -> pre_process -> mapped table tasks
+check_config >> table_names
 
 # Set dependencies for the process_all task
 check_config >> process_all
@@ -11,12 +11,12 @@ import sys
 import json
 import logging
 import argparse
+from datetime import datetime
+from functools import lru_cache
 from typing import Dict, Any, Optional, List
 from dotenv import load_dotenv
 
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
+from utils.config import read_config
 from utils.database import DatabaseManager
 from utils.storage import StorageManager
 from services.cdc import CDCService
@@ -39,66 +39,88 @@ def load_config(config_path: str) -> Dict[str, Any]:
         Configuration as a dictionary
     """
     try:
-        with open(config_path, "r") as f:
-            return json.load(f)
+        return read_config(config_path)
     except (FileNotFoundError, json.JSONDecodeError) as e:
         logger.error(f"Failed to load configuration: {str(e)}")
         sys.exit(1)
 
 
+@lru_cache(maxsize=4)
+def _get_managers(config_path: str):
+    """Create database and storage managers once per config path.
+    
+    Managers hold the SQLAlchemy connection pools and the MinIO client, so
+    reusing them across tables/tasks in the same process avoids reconnecting.
+    
+    Args:
+        config_path: Path to the configuration file
+        
+    Returns:
+        Tuple of (DatabaseManager, StorageManager)
+    """
+    return DatabaseManager(config_path), StorageManager(config_path)
+
+
 def run_cdc(
     config_path: str,
     config: Dict[str, Any],
-    table_names: Optional[List[str]] = None
+    table_names: Optional[List[str]] = None,
+    run_ts: Optional[datetime] = None
 ) -> None:
     """Run CDC operations on specified tables or all tables.
     
+    Tables are processed by `CDCService.process_all_tables`, which runs
+    up to `global_settings.parallelism` of them at once.
+    
     Args:
         config_path: Path to the configuration file
         config: Configuration dictionary
         table_names: List of table names to process, or None for all tables
+        run_ts: Snapshot timestamp of the run. Callers processing one run's
+            tables in several calls pass the same value, so the run's
+            snapshots group together. If None, uses current time
     """
-    # Initialize managers
-    db_manager = DatabaseManager(config_path)
-    storage_manager = StorageManager(config_path)
+    # Reuse pooled managers for this config
+    db_manager, storage_manager = _get_managers(config_path)
     
     # Initialize CDC service
     cdc_service = CDCService(db_manager, storage_manager)
     
-    # Get table configs
-    all_tables = config.get("tables", {})
+    # Hash tables run in worker processes, timestamp tables on threads
+    results = cdc_service.process_all_tables(table_names, run_ts=run_ts)
     
-    # Filter tables if names provided
-    tables_to_process = {}
-    if table_names:
-        for name in table_names:
-            if name in all_tables:
-                tables_to_process[name] = all_tables[name]
-            else:
-                logger.warning(f"Table '{name}' not found in configuration")
-    else:
-        tables_to_process = all_tables
+    summary_lines = []
+    for table_name, result in results.items():
+        if result.get("status") == "success":
+            summary_lines.append(f"  {table_name}: {_format_summary(result)}")
+        else:
+            logger.error(f"Failed to process table {table_name}: {result.get('message', 'Unknown error')}")
+            summary_lines.append(f"  {table_name}: failed")
     
-    # Process tables
-    for table_name, _ in tables_to_process.items():
-        logger.info(f"Processing table: {table_name}")
-        try:
-            result = cdc_service.process_table(table_name)
-            
-            # Log summary
-            if result.get("status") == "success":
-                changes = result.get("changes", {})
-                logger.info(    
-                    f"Table {table_name} processed successfully with method {result.get('method')}: "
-                    f"Added={changes.get('added', 0)}, "
-                    f"Modified={changes.get('modified', 0)}, "
-                    f"Deleted={changes.get('deleted', 0)}"
-                )
-            else:
-                logger.error(f"Failed to process table {table_name}: {result.get('message', 'Unknown error')}")
-                
-        except Exception as e:
-            logger.error(f"Error processing table {table_name}: {str(e)}", exc_info=True)
+    # Single summary record instead of one log call per table
+    if summary_lines:
+        logger.info("CDC results:\n" + "\n".join(summary_lines))
+
+
+def _format_summary(result: Dict[str, Any]) -> str:
+    """Render a one-line change summary for a successful table result.
+    
+    Args:
+        result: Result of CDCService.process_table
+        
+    Returns:
+        Summary text
+    """
+    changes = result.get("changes", {})
+    if not isinstance(changes, dict):
+        # Timestamp method returns the changed rows with a separate count
+        return f"method={result.get('method')} Changes={result.get('changes_count', 0)}"
+    return (
+        f"method={result.get('method')} "
+        f"Added={changes.get('added', 0)}, "
+        f"Modified={changes.get('modified', 0)}, "
+        f"Deleted={changes.get('deleted', 0)}"
+    )
 
 
 def main():
@@ -127,8 +149,8 @@ def main():
     # Load configuration
     config = load_config(config_path)
     
-    # Run CDC
-    run_cdc(config_path, config, args.tables)
+    # Run CDC; every table of this invocation shares one snapshot timestamp
+    run_cdc(config_path, config, args.tables, run_ts=datetime.now())
     
     logger.info("CDC operations completed.")
 
@@ -1,11 +1,40 @@
 import logging
-from typing import Dict, Any, List
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 from services.cdc_strategy import CDCStrategyFactory
 from services.snapshot import SnapshotService
+from utils.database import DatabaseManager
+from utils.storage import StorageManager
 
 logger = logging.getLogger(__name__)
 
+# Methods whose per-row hashing is CPU-bound and benefits from separate processes
+CPU_BOUND_METHODS = {"hash", "hash-partition", "hashpartition"}
+
+# Tables processed at once when `global_settings.parallelism` is not set
+DEFAULT_PARALLELISM = 1
+
+# CDCService owned by the current worker process (see _init_worker)
+_worker_service = None
+
+
+def _init_worker(config_path: str, snapshot_config: Dict[str, Any]) -> None:
+    """Build a CDCService for a worker process.
+    
+    Connection pools and the MinIO client cannot be pickled, so each worker
+    creates its own managers from the configuration file.
+    """
+    global _worker_service
+    _worker_service = CDCService(DatabaseManager(config_path), StorageManager(config_path), snapshot_config)
+
+
+def _process_table_in_worker(table_name: str, run_ts: Optional[datetime] = None) -> Dict[str, Any]:
+    """Process a table with the worker process's CDCService."""
+    return _worker_service.process_table(table_name, run_ts=run_ts)
+
+
 class CDCService:
     """Service for implementing Change Data Capture (CDC) with snapshot diffs.
     
@@ -16,7 +45,7 @@ class CDCService:
     for ETL staging processes.
     """
     
-    def __init__(self, db_manager, storage_manager, snapshot_config: Dict[str, Any] = None):
+    def __init__(self, db_manager, storage_manager, snapshot_config: Optional[Dict[str, Any]] = None):
         """Initialize the CDC service.
         
         Args:
@@ -35,11 +64,12 @@ class CDCService:
         self.snapshot_enabled = self.global_config.get("snapshot", {}).get("enabled", True)
         self.snapshot_format = self.global_config.get("snapshot", {}).get("format", "json")
     
-    def process_table(self, table_name: str) -> Dict[str, Any]:
+    def process_table(self, table_name: str, run_ts: Optional[datetime] = None) -> Dict[str, Any]:
         """Process a table according to its CDC method.
         
         Args:
             table_name: Name of the table to process
+            run_ts: Snapshot timestamp shared by a batch run. If None, uses current time
             
         Returns:
             Dictionary with processing results
@@ -68,83 +98,185 @@ class CDCService:
                     "message": f"Unsupported CDC method: {method}"
                 }
                 
-            # Use the strategy to process the table
-            result = strategy.process(table_name, table_config, datasource_name)
-            
-            # If CDC processing was successful, save snapshot
-            if result.get("status") == "success" and self.snapshot_enabled:
-                snapshot_result = self._save_snapshot(table_name, datasource_name, result)
+            # Skip the full scan when a cheap pre-check shows nothing changed
+            if not strategy.has_changes(table_name, table_config, datasource_name):
+                logger.info(f"No changes detected for {table_name} since last run, skipping")
+                return {
+                    "status": "success",
+                    "table_name": table_name,
+                    "method": method,
+                    "skipped": True,
+                    "changes": {
+                        "added": 0,
+                        "modified": 0,
+                        "deleted": 0
+                    }
+                }
                 
-                # Add snapshot info to result
-                result["snapshot"] = snapshot_result
+            # Without snapshots the changes are only counted
+            if not self.snapshot_enabled:
+                return self._count_changes(strategy.changes_iter(table_name, table_config, datasource_name))
             
-            return result
+            # With snapshots, changes stream straight into the snapshot files
+            return self._process_with_snapshot(strategy, table_name, datasource_name, table_config, run_ts=run_ts)
             
         except Exception as e:
             logger.exception(f"Error processing table {table_name}: {str(e)}")
             return {"status": "error", "message": f"Error: {str(e)}"}
     
-    def process_all_tables(self) -> Dict[str, Any]:
-        """Process all tables defined in the configuration.
+    @staticmethod
+    def _count_changes(stream) -> Dict[str, Any]:
+        """Drain a `changes_iter` stream, keeping only its result summary.
+        
+        Args:
+            stream: Generator returned by `CDCStrategy.changes_iter`
+            
+        Returns:
+            Result summary with change counts
+        """
+        while True:
+            try:
+                next(stream)
+            except StopIteration as stop:
+                return stop.value or {}
+    
+    def process_all_tables(
+        self, 
+        table_names: Optional[List[str]] = None, 
+        run_ts: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Process all tables defined in the configuration, or a subset of them.
+        
+        Tables using hash methods are spread over worker processes, since
+        row hashing is CPU-bound and holds the GIL; timestamp tables are
+        IO-bound and run on threads in this process. Both pools are sized
+        by `global_settings.parallelism` (default: DEFAULT_PARALLELISM), and
+        a value of 1 processes tables one after another.
+        
+        Args:
+            table_names: Tables to process, or None for all tables. Names
+                missing from the configuration are logged and skipped
+            run_ts: Snapshot timestamp shared by every table of the run, so
+                its snapshots group together. If None, uses current time
         
         Returns:
-            Results for all tables
+            Results per table, in configuration order
         """
         table_configs = self.db_manager.get_all_table_configs()
+        if table_names:
+            requested = set(table_names)
+            for name in sorted(requested - table_configs.keys()):
+                logger.warning(f"Table '{name}' not found in configuration")
+            table_configs = {name: config for name, config in table_configs.items() if name in requested}
+        
         results = {}
         
-        for table_name in table_configs:
-            logger.info(f"Processing table {table_name}")
-            result = self.process_table(table_name)
-            results[table_name] = result
+        # One timestamp for the whole run so its snapshots group together
+        if run_ts is None:
+            run_ts = datetime.now()
+        
+        parallelism = self.global_config.get("parallelism", DEFAULT_PARALLELISM)
+            
+        if parallelism <= 1 or len(table_configs) <= 1:
+            for table_name in table_configs:
+                logger.info(f"Processing table {table_name}")
+                result = self.process_table(table_name, run_ts=run_ts)
+                results[table_name] = result
             
-        return results
+            return results
+        
+        cpu_bound = [
+            table_name for table_name, table_config in table_configs.items()
+            if table_config.get("method", "").lower() in CPU_BOUND_METHODS
+        ]
+        io_bound = [table_name for table_name in table_configs if table_name not in cpu_bound]
+        
+        futures = {}
+        executors = []
+        try:
+            if cpu_bound:
+                # Spawned workers do not inherit this process's open connections
+                processes = ProcessPoolExecutor(
+                    max_workers=min(parallelism, len(cpu_bound)),
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.db_manager.config_path, self.snapshot_service.config)
+                )
+                executors.append(processes)
+                for table_name in cpu_bound:
+                    logger.info(f"Processing table {table_name} in a worker process")
+                    futures[processes.submit(_process_table_in_worker, table_name, run_ts)] = table_name
+            
+            if io_bound:
+                threads = ThreadPoolExecutor(max_workers=min(parallelism, len(io_bound)))
+                executors.append(threads)
+                for table_name in io_bound:
+                    logger.info(f"Processing table {table_name}")
+                    futures[threads.submit(self.process_table, table_name, run_ts=run_ts)] = table_name
+            
+            for future in as_completed(futures):
+                table_name = futures[future]
+                try:
+                    results[table_name] = future.result()
+                except Exception as e:
+                    logger.exception(f"Error processing table {table_name}: {str(e)}")
+                    results[table_name] = {"status": "error", "message": f"Error: {str(e)}"}
+        finally:
+            for executor in executors:
+                executor.shutdown()
+        
+        # Report results in configuration order
+        return {table_name: results[table_name] for table_name in table_configs}
     
-    def _save_snapshot(self, table_name: str, datasource_name: str, cdc_result: Dict[str, Any]) -> Dict[str, Any]:
-        """Save CDC changes as snapshot files.
+    def _process_with_snapshot(
+        self, 
+        strategy, 
+        table_name: str, 
+        datasource_name: str, 
+        table_config: Dict[str, Any],
+        run_ts: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Run a CDC strategy and write its changes as snapshot files.
+        
+        Changes are written chunk by chunk as the strategy produces them,
+        so the returned result holds change counts but not the rows.
         
         Args:
             table_name: Name of the table
             datasource_name: Name of the datasource
-            cdc_result: Result from CDC processing
+            table_config: Table configuration already resolved by the caller
+            run_ts: Snapshot timestamp. If None, uses current time
             
         Returns:
-            Result of snapshot save operation
+            Results of the CDC run with snapshot info
         """
-        try:
-            # Extract changes from CDC result
-            changes = {
-                "added": cdc_result.get("added", []),
-                "modified": cdc_result.get("modified", []),
-                "deleted": cdc_result.get("deleted", [])
-            }
-            
-            # Get table-specific snapshot format if configured
-            table_config = self.db_manager.get_table_config(table_name)
-            table_snapshot_format = table_config.get("snapshot_format", self.snapshot_format)
-            
-            # Save snapshot
-            snapshot_result = self.snapshot_service.save_changes_snapshot(
-                table_name=table_name,
-                datasource_name=datasource_name,
-                changes=changes,
-                format_type=table_snapshot_format,
-                timestamp=datetime.now()
-            )
-            
+        result: Dict[str, Any] = {}
+        
+        def chunks():
+            result.update((yield from strategy.changes_iter(table_name, table_config, datasource_name)) or {})
+        
+        # Get table-specific snapshot format if configured
+        table_snapshot_format = table_config.get("snapshot_format", self.snapshot_format)
+        
+        snapshot_result = self.snapshot_service.save_changes_stream(
+            table_name=table_name,
+            datasource_name=datasource_name,
+            chunks=chunks(),
+            format_type=table_snapshot_format,
+            timestamp=run_ts or datetime.now(),
+            batched=True
+        )
+        
+        # If CDC processing was successful, add snapshot info to result
+        if result.get("status") == "success":
             if snapshot_result.get("status") == "success":
                 logger.info(f"Snapshot saved for {table_name}: {snapshot_result.get('total_files', 0)} files")
-            else:
+            elif snapshot_result.get("status") != "skipped":
                 logger.warning(f"Failed to save snapshot for {table_name}: {snapshot_result.get('message', 'Unknown error')}")
             
-            return snapshot_result
-            
-        except Exception as e:
-            logger.error(f"Error saving snapshot for {table_name}: {str(e)}")
-            return {
-                "status": "error",
-                "message": f"Snapshot save failed: {str(e)}"
-            }
+            result["snapshot"] = snapshot_result
+        
+        return result
     
     def list_table_snapshots(self, table_name: str, datasource_name: str) -> List[str]:
         """List snapshots for a specific table.
@@ -1,12 +1,20 @@
 import logging
 import abc
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, Generator, List, Optional, Tuple, Type
+
+import pandas as pd
 
 from utils.database import DatabaseManager
 from utils.storage import StorageManager
 
 logger = logging.getLogger(__name__)
 
+# Rows per chunk yielded by CDCStrategy.changes_iter
+CHANGE_CHUNK_ROWS = 65536
+
+ChangeStream = Generator[Tuple[str, pd.DataFrame], None, Dict[str, Any]]
+
 
 class CDCStrategy(abc.ABC):
     """Abstract base class for CDC strategies."""
@@ -34,6 +42,129 @@ class CDCStrategy(abc.ABC):
             Results of the operation
         """
         pass
+    
+    def has_changes(self, table_name: str, table_config: Dict[str, Any], datasource_name: str) -> bool:
+        """Cheap pre-check for whether the table may have changed since the last run.
+        
+        Strategies that can answer with a lightweight query override this;
+        the default always reports possible changes.
+        
+        Args:
+            table_name: Name of the table
+            table_config: Table configuration
+            datasource_name: Name of the datasource
+            
+        Returns:
+            False only if the table is known to be unchanged
+        """
+        return True
+    
+    def changes_iter(
+        self, 
+        table_name: str, 
+        table_config: Dict[str, Any], 
+        datasource_name: str, 
+        chunk_size: int = CHANGE_CHUNK_ROWS
+    ) -> ChangeStream:
+        """Stream detected changes as (change_type, DataFrame) chunks.
+        
+        Chunks hold at most `chunk_size` rows and change_type is one of
+        'added', 'modified' or 'deleted'. The generator's return value is
+        the `process` result without the change rows, so consumers can
+        write chunks out as they arrive instead of holding every change in
+        memory. The default runs `process` and slices its result;
+        strategies that scan in batches override it to yield while scanning.
+        
+        Args:
+            table_name: Name of the table
+            table_config: Table configuration
+            datasource_name: Name of the datasource
+            chunk_size: Maximum rows per yielded chunk
+            
+        Returns:
+            Generator of change chunks returning the result summary
+        """
+        result = self.process(table_name, table_config, datasource_name)
+        
+        for change_type in ("added", "modified", "deleted"):
+            rows = result.pop(change_type, None)
+            if rows is None:
+                continue
+            if not isinstance(rows, pd.DataFrame):
+                rows = pd.DataFrame(rows)
+            for start in range(0, len(rows), chunk_size):
+                yield change_type, rows.iloc[start:start + chunk_size]
+        
+        return result
+    
+    def _collect_changes(self, stream: ChangeStream) -> Dict[str, Any]:
+        """Drain a `changes_iter` stream into a `process`-style result.
+        
+        Args:
+            stream: Generator returned by `changes_iter`
+            
+        Returns:
+            Result summary with 'added', 'modified' and 'deleted' DataFrames
+        """
+        frames: Dict[str, List[pd.DataFrame]] = {"added": [], "modified": [], "deleted": []}
+        
+        while True:
+            try:
+                change_type, rows = next(stream)
+            except StopIteration as stop:
+                result = stop.value or {}
+                break
+            frames[change_type].append(rows)
+        
+        if result.get("status") == "success":
+            for change_type, chunks in frames.items():
+                result[change_type] = self._concat_frames(chunks)
+        return result
+    
+    @staticmethod
+    def _concat_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+        """Concatenate per-batch change slices into one DataFrame.
+        
+        Args:
+            frames: DataFrames holding changed rows
+            
+        Returns:
+            Combined DataFrame (empty if there were no changes)
+        """
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+
+# Strategy implementations subclass CDCStrategy, so they are imported once
+# the base class exists; the registry is then a plain dict lookup.
+from services.strategies.timestamp_strategy import TimestampCDCStrategy  # noqa: E402
+from services.strategies.hash_strategy import HashCDCStrategy  # noqa: E402
+from services.strategies.hash_partition_strategy import HashPartitionCDCStrategy  # noqa: E402
+
+_STRATEGY_REGISTRY: Dict[str, Type[CDCStrategy]] = {
+    "timestamp": TimestampCDCStrategy,
+    "hash": HashCDCStrategy,
+    "hash-partition": HashPartitionCDCStrategy,
+    "hashpartition": HashPartitionCDCStrategy,
+}
+
+
+@lru_cache(maxsize=32)
+def _get_strategy(
+    method: str,
+    db_manager: DatabaseManager,
+    storage_manager: StorageManager
+) -> CDCStrategy:
+    """Return a shared strategy instance per (method, managers).
+    
+    One instance serves every table processed with the same managers,
+    so strategies keep per-table state only from one call to the next of
+    the same run: `HashPartitionCDCStrategy` hands the signature taken by
+    `has_changes` to the scan that follows, keyed by table, and drops it
+    once the scan has taken it over.
+    """
+    return _STRATEGY_REGISTRY[method](db_manager, storage_manager)
 
 
 class CDCStrategyFactory:
@@ -57,15 +188,8 @@ class CDCStrategyFactory:
         """
         method = method.lower()
         
-        if method == "timestamp":
-            from services.strategies.timestamp_strategy import TimestampCDCStrategy
-            return TimestampCDCStrategy(db_manager, storage_manager)
-        elif method == "hash":
-            from services.strategies.hash_strategy import HashCDCStrategy
-            return HashCDCStrategy(db_manager, storage_manager)
-        elif method in ["hash-partition", "hashpartition"]:
-            from services.strategies.hash_partition_strategy import HashPartitionCDCStrategy
-            return HashPartitionCDCStrategy(db_manager, storage_manager)
+        if method in _STRATEGY_REGISTRY:
+            return _get_strategy(method, db_manager, storage_manager)
             
         logger.error(f"Unsupported CDC method: {method}")
-        return None
\ No newline at end of file
+        return None
@@ -1,10 +1,30 @@
 import logging
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+import re
+from typing import Dict, Any, Iterable, Optional, List, Tuple
+from datetime import datetime, timedelta
+
+import pandas as pd
+
 from services.snapshot_strategy import SnapshotStrategyFactory
 
 logger = logging.getLogger(__name__)
 
+# snapshots/{datasource}/{table}/{YYYYMMDD_HHMMSS}[_{operation}].{extension}
+_SNAPSHOT_KEY = re.compile(
+    r"^snapshots/(?P<datasource>[^/]+)/(?P<table>[^/]+)/"
+    r"(?P<timestamp>(?P<Y>\d{4})(?P<m>\d{2})(?P<d>\d{2})_(?P<H>\d{2})(?P<M>\d{2})(?P<S>\d{2}))"
+    r"(?:_(?P<operation>[^./]+))?\.(?P<extension>\w+)$"
+)
+
+# Per-table index of snapshot files, one "timestamp<TAB>operation<TAB>key" line each
+SNAPSHOT_INDEX_NAME = "_index.tsv"
+
+# Snapshots this close to the newest indexed one are always listed from
+# storage as well, since concurrent saves of a table can overwrite each
+# other's index update. It covers the longest streamed save, as a
+# snapshot's key carries the time its save started
+SNAPSHOT_INDEX_OVERLAP = timedelta(days=1)
+
 
 class SnapshotService:
     """Service for managing snapshot storage with different formats.
@@ -35,16 +55,20 @@ class SnapshotService:
         datasource_name: str, 
         changes: Dict[str, Any],
         format_type: Optional[str] = None,
-        timestamp: Optional[datetime] = None
+        timestamp: Optional[datetime] = None,
+        batched: bool = False
     ) -> Dict[str, Any]:
         """Save CDC changes as snapshot files.
         
         Args:
             table_name: Name of the table
             datasource_name: Name of the datasource
-            changes: Changes data containing 'added', 'modified', 'deleted'
+            changes: Changes data containing 'added', 'modified', 'deleted',
+                each a list of records or a DataFrame
             format_type: Format type (json, parquet, csv). If None, uses default
             timestamp: Timestamp for the snapshot. If None, uses current time
+            batched: Write all change types into a single file when the
+                format supports it (Parquet)
             
         Returns:
             Result of the save operation
@@ -85,21 +109,13 @@ class SnapshotService:
                 }
             
             # Save snapshot using strategy
-            result = strategy.save_snapshot(table_name, datasource_name, changes, timestamp)
-            
-            # Add metadata to result
-            if result.get("status") == "success":
-                result.update({
-                    "table_name": table_name,
-                    "datasource": datasource_name,
-                    "timestamp": timestamp.isoformat(),
-                    "changes_summary": {
-                        "added": len(changes.get("added", [])),
-                        "modified": len(changes.get("modified", [])),
-                        "deleted": len(changes.get("deleted", []))
-                    }
-                })
+            if batched:
+                result = strategy.save_batched_snapshot(table_name, datasource_name, changes, timestamp)
+            else:
+                result = strategy.save_snapshot(table_name, datasource_name, changes, timestamp)
             
+            result = self._add_metadata(result, table_name, datasource_name, changes, timestamp)
+            self._record_snapshot(result)
             return result
             
         except Exception as e:
@@ -109,6 +125,104 @@ class SnapshotService:
                 "message": f"Failed to save snapshot: {str(e)}"
             }
     
+    def save_changes_stream(
+        self, 
+        table_name: str, 
+        datasource_name: str, 
+        chunks: Iterable[Tuple[str, pd.DataFrame]], 
+        format_type: Optional[str] = None, 
+        timestamp: Optional[datetime] = None, 
+        batched: bool = False
+    ) -> Dict[str, Any]:
+        """Save CDC changes as snapshot files while they are being produced.
+        
+        Chunks are handed to the format's snapshot writer as they arrive,
+        so formats that write incrementally never hold every change in
+        memory. The iterable is always consumed to the end, even after a
+        write error, so a CDC strategy feeding it still finishes its run;
+        errors raised by the iterable itself are propagated.
+        
+        Args:
+            table_name: Name of the table
+            datasource_name: Name of the datasource
+            chunks: Iterable of (change_type, rows) pairs, where change_type
+                is 'added', 'modified' or 'deleted'
+            format_type: Format type (json, parquet, csv). If None, uses default
+            timestamp: Timestamp for the snapshot. If None, uses current time
+            batched: Write all change types into a single file when the
+                format supports it (Parquet)
+                
+        Returns:
+            Result of the save operation
+        """
+        # Use provided format or default
+        if format_type is None:
+            format_type = self.default_format
+        
+        # Use provided timestamp or current time
+        if timestamp is None:
+            timestamp = datetime.now()
+        
+        logger.info(f"Streaming snapshot for {datasource_name}.{table_name} in {format_type} format")
+        
+        strategy = SnapshotStrategyFactory.create_strategy(format_type, self.storage_manager)
+        writer = None
+        if strategy:
+            writer = strategy.open_writer(table_name, datasource_name, timestamp, batched)
+        
+        write_error = None
+        try:
+            for change_type, rows in chunks:
+                if writer is None or write_error is not None:
+                    continue
+                try:
+                    writer.write(change_type, rows)
+                except Exception as e:
+                    logger.error(f"Error writing snapshot chunk for {table_name}: {str(e)}")
+                    write_error = e
+                    writer.abort()
+        except BaseException:
+            if writer is not None and write_error is None:
+                writer.abort()
+            raise
+        
+        if writer is None:
+            return {
+                "status": "error",
+                "message": f"Unsupported format: {format_type}"
+            }
+        
+        if write_error is not None:
+            return {
+                "status": "error",
+                "message": f"Failed to save snapshot: {str(write_error)}"
+            }
+        
+        try:
+            result = writer.close()
+        except Exception as e:
+            writer.abort()
+            logger.error(f"Error saving snapshot: {str(e)}")
+            return {
+                "status": "error",
+                "message": f"Failed to save snapshot: {str(e)}"
+            }
+        
+        if result.get("status") == "skipped":
+            logger.info(f"No changes detected for {table_name}, skipping snapshot")
+        
+        # Add metadata to result
+        if result.get("status") == "success":
+            result.update({
+                "table_name": table_name,
+                "datasource": datasource_name,
+                "timestamp": timestamp.isoformat(),
+                "changes_summary": dict(writer.counts)
+            })
+            self._record_snapshot(result)
+        
+        return result
+    
     def save_multiple_snapshots(
         self,
         snapshots: List[Dict[str, Any]],
@@ -127,25 +241,45 @@ class SnapshotService:
         Returns:
             Results of batch save operation
         """
-        results = []
-        successful = 0
-        failed = 0
-        
-        for snapshot_data in snapshots:
-            result = self.save_changes_snapshot(
-                table_name=snapshot_data["table_name"],
-                datasource_name=snapshot_data["datasource_name"],
-                changes=snapshot_data["changes"],
-                format_type=format_type,
-                timestamp=snapshot_data.get("timestamp")
-            )
-            
-            results.append(result)
+        # Use provided format or default
+        if format_type is None:
+            format_type = self.default_format
+        
+        # One strategy instance serves the whole batch
+        strategy = SnapshotStrategyFactory.create_strategy(format_type, self.storage_manager)
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(snapshots)
+        pending = []
+        
+        for index, snapshot_data in enumerate(snapshots):
+            changes = snapshot_data["changes"]
             
-            if result.get("status") == "success":
-                successful += 1
+            if not strategy:
+                results[index] = {"status": "error", "message": f"Unsupported format: {format_type}"}
+            elif not self._validate_changes(changes):
+                results[index] = {"status": "error", "message": "Invalid changes data structure"}
+            elif not self._has_changes(changes):
+                results[index] = {"status": "skipped", "message": "No changes to save"}
             else:
-                failed += 1
+                timestamp = snapshot_data.get("timestamp") or datetime.now()
+                pending.append((index, (snapshot_data["table_name"], snapshot_data["datasource_name"], changes, timestamp)))
+        
+        # Snapshots with changes are uploaded concurrently
+        if pending:
+            logger.info(f"Saving {len(pending)} snapshots in {format_type} format")
+            saved = strategy.save_snapshot_batch(
+                [item for _, item in pending], 
+                max_workers=self.config.get("max_workers", 4)
+            )
+            for (index, item), result in zip(pending, saved):
+                results[index] = self._add_metadata(result, *item)
+            
+            # Indexes are updated after the uploads, one table at a time
+            for index, _ in pending:
+                self._record_snapshot(results[index])
+        
+        successful = sum(1 for result in results if result.get("status") == "success")
+        failed = len(results) - successful
         
         return {
             "status": "completed",
@@ -164,6 +298,11 @@ class SnapshotService:
     ) -> List[str]:
         """List available snapshots with optional filtering.
         
+        For a single table the keys come from its snapshot index, merged
+        with a listing of only the snapshots since shortly before the
+        newest indexed one; tables without an index yet are listed from
+        storage.
+        
         Args:
             table_name: Filter by table name
             datasource_name: Filter by datasource name
@@ -182,29 +321,54 @@ class SnapshotService:
             if table_name:
                 prefix += f"{table_name}/"
             
-            # Get all snapshot files
-            snapshot_files = self.storage_manager.list_states(prefix)
+            # Within one table, keys start with the timestamp and list in
+            # date order, so the date range is pushed down to the listing
+            start_after = None
+            stop_after = None
+            if datasource_name and table_name:
+                if start_date:
+                    start_after = f"{prefix}{start_date.strftime('%Y%m%d_%H%M%S')}"
+                if end_date:
+                    stop_after = f"{prefix}{end_date.strftime('%Y%m%d_%H%M%S')}\U0010ffff"
+            
+            snapshot_files = None
+            if datasource_name and table_name:
+                indexed = self._read_index(datasource_name, table_name)
+                if indexed is not None:
+                    snapshot_files = self._merge_recent(
+                        datasource_name, table_name, indexed, start_after, stop_after
+                    )
             
-            # Apply date filtering if provided
+            if snapshot_files is None:
+                # Get snapshot files, only those in range if pushed down
+                snapshot_files = [
+                    file_key for file_key in self.storage_manager.list_states(prefix, start_after=start_after, stop_after=stop_after)
+                    if not file_key.endswith(f"/{SNAPSHOT_INDEX_NAME}")
+                ]
+            
+            # Apply exact date filtering if provided
             if start_date or end_date:
                 filtered_files = []
                 for file_key in snapshot_files:
-                    # Extract timestamp from filename
+                    # One regex pass per key; skip files with invalid timestamp format
+                    match = _SNAPSHOT_KEY.match(file_key)
+                    if not match:
+                        continue
+                    
                     try:
-                        parts = file_key.split('/')
-                        if len(parts) >= 4:
-                            timestamp_part = parts[3].split('_')[0] + '_' + parts[3].split('_')[1]
-                            file_timestamp = datetime.strptime(timestamp_part, "%Y%m%d_%H%M%S")
+                        file_timestamp = datetime(
+                            int(match["Y"]), int(match["m"]), int(match["d"]), 
+                            int(match["H"]), int(match["M"]), int(match["S"])
+                        )
+                    except ValueError:
+                        continue
                             
-                            if start_date and file_timestamp < start_date:
-                                continue
-                            if end_date and file_timestamp > end_date:
-                                continue
-                                
-                            filtered_files.append(file_key)
-                    except (ValueError, IndexError):
-                        # Skip files with invalid timestamp format
+                    if start_date and file_timestamp < start_date:
+                        continue
+                    if end_date and file_timestamp > end_date:
                         continue
+                                
+                    filtered_files.append(file_key)
                 
                 snapshot_files = filtered_files
             
@@ -232,21 +396,13 @@ class SnapshotService:
                 return summary_data
             
             # If no summary, extract info from filename
-            parts = file_key.split('/')
-            if len(parts) >= 4:
-                datasource = parts[1]
-                table = parts[2]
-                filename = parts[3]
-                
-                # Extract timestamp and operation
-                timestamp_part = filename.split('_')[0] + '_' + filename.split('_')[1]
-                operation = filename.split('_')[2].split('.')[0] if '_' in filename else 'unknown'
-                
+            match = _SNAPSHOT_KEY.match(file_key)
+            if match:
                 return {
-                    "datasource": datasource,
-                    "table_name": table,
-                    "timestamp": timestamp_part,
-                    "operation": operation,
+                    "datasource": match["datasource"],
+                    "table_name": match["table"],
+                    "timestamp": match["timestamp"],
+                    "operation": match["operation"] or 'unknown',
                     "file_key": file_key
                 }
             
@@ -256,6 +412,127 @@ class SnapshotService:
             logger.error(f"Error getting snapshot info: {str(e)}")
             return None
     
+    @staticmethod
+    def _add_metadata(
+        result: Dict[str, Any], 
+        table_name: str, 
+        datasource_name: str, 
+        changes: Dict[str, Any], 
+        timestamp: datetime
+    ) -> Dict[str, Any]:
+        """Add snapshot metadata to a successful save result of validated changes."""
+        if result.get("status") == "success":
+            result.update({
+                "table_name": table_name,
+                "datasource": datasource_name,
+                "timestamp": timestamp.isoformat(),
+                "changes_summary": {
+                    "added": len(changes["added"]),
+                    "modified": len(changes["modified"]),
+                    "deleted": len(changes["deleted"])
+                }
+            })
+        return result
+    
+    def _record_snapshot(self, result: Dict[str, Any]) -> None:
+        """Append the files of a successful save to the table's snapshot index.
+        
+        Object storage has no append or conditional write, so the index is
+        read, extended and rewritten, and a concurrent save of the same
+        table can overwrite this update. Entries lost that way are within
+        SNAPSHOT_INDEX_OVERLAP of the newest one, so they are still found
+        by the recent listing merged into every read and restored by the
+        next update. The first index of a table is seeded from a full
+        listing. A failed update is logged and leaves the snapshot itself
+        in place.
+        
+        Args:
+            result: Save result with table_name, datasource and files_saved
+        """
+        if result.get("status") != "success" or not result.get("files_saved"):
+            return
+        
+        datasource_name = result["datasource"]
+        table_name = result["table_name"]
+        index_key = self._index_key(datasource_name, table_name)
+        
+        try:
+            indexed = self._merge_recent(
+                datasource_name, table_name, self._read_index(datasource_name, table_name) or []
+            )
+            
+            known = set(indexed)
+            for file_key in result["files_saved"]:
+                if file_key not in known:
+                    known.add(file_key)
+                    indexed.append(file_key)
+            
+            lines = []
+            for file_key in indexed:
+                match = _SNAPSHOT_KEY.match(file_key)
+                if match:
+                    lines.append(f"{match['timestamp']}\t{match['operation'] or ''}\t{file_key}\n")
+            
+            self.storage_manager.store_snapshot(
+                index_key, "".join(lines).encode("utf-8"), content_type='text/tab-separated-values'
+            )
+        except Exception as e:
+            logger.warning(f"Error updating snapshot index {index_key}: {str(e)}")
+    
+    def _read_index(self, datasource_name: str, table_name: str) -> Optional[List[str]]:
+        """Read the snapshot keys recorded in a table's index.
+        
+        Returns:
+            Sorted snapshot keys, or None if the table has no index
+        """
+        data = self.storage_manager.retrieve_object(self._index_key(datasource_name, table_name))
+        if data is None:
+            return None
+        
+        return sorted({line.rsplit("\t", 1)[-1] for line in data.decode("utf-8").splitlines() if line})
+    
+    def _merge_recent(
+        self, 
+        datasource_name: str, 
+        table_name: str, 
+        indexed: List[str], 
+        start_after: Optional[str] = None, 
+        stop_after: Optional[str] = None
+    ) -> List[str]:
+        """Merge indexed snapshot keys with a listing of the table's recent snapshots.
+        
+        The listing starts SNAPSHOT_INDEX_OVERLAP before the newest indexed
+        snapshot, or at `start_after` if that is later; with nothing
+        indexed the whole table is listed.
+        
+        Args:
+            datasource_name: Name of the datasource
+            table_name: Name of the table
+            indexed: Sorted keys from the table's index
+            start_after: Only list keys that sort after this key
+            stop_after: Stop listing at the first key that sorts after this key
+            
+        Returns:
+            Sorted snapshot keys
+        """
+        prefix = f"snapshots/{datasource_name}/{table_name}/"
+        index_key = self._index_key(datasource_name, table_name)
+        
+        # Keys sort by timestamp, so the newest indexed snapshot is the last match
+        newest = next((match for match in map(_SNAPSHOT_KEY.match, reversed(indexed)) if match), None)
+        if newest:
+            newest_timestamp = datetime.strptime(newest["timestamp"], "%Y%m%d_%H%M%S")
+            recent_after = f"{prefix}{(newest_timestamp - SNAPSHOT_INDEX_OVERLAP).strftime('%Y%m%d_%H%M%S')}"
+            start_after = max(start_after, recent_after) if start_after else recent_after
+        
+        listed = self.storage_manager.list_states(prefix, start_after=start_after, stop_after=stop_after)
+        return sorted(set(indexed).union(listed) - {index_key})
+    
+    @staticmethod
+    def _index_key(datasource_name: str, table_name: str) -> str:
+        """Key of a table's snapshot index."""
+        return f"snapshots/{datasource_name}/{table_name}/{SNAPSHOT_INDEX_NAME}"
+    
     def _validate_changes(self, changes: Dict[str, Any]) -> bool:
         """Validate changes data structure.
         
@@ -273,7 +550,7 @@ class SnapshotService:
         for key in required_keys:
             if key not in changes:
                 return False
-            if not isinstance(changes[key], list):
+            if not isinstance(changes[key], (list, pd.DataFrame)):
                 return False
         
         return True
@@ -282,16 +559,13 @@ class SnapshotService:
         """Check if there are any changes to save.
         
         Args:
-            changes: Changes data
+            changes: Changes data that passed `_validate_changes`
             
         Returns:
             True if there are changes, False otherwise
         """
-        return (
-            len(changes.get("added", [])) > 0 or
-            len(changes.get("modified", [])) > 0 or
-            len(changes.get("deleted", [])) > 0
-        )
+        # len() rather than truthiness, which DataFrames do not support
+        return bool(len(changes["added"]) or len(changes["modified"]) or len(changes["deleted"]))
     
     def close(self) -> None:
         """Clean up resources."""
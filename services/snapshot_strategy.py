@@ -1,8 +1,11 @@
 import logging
 import abc
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Tuple, Type, Union
 from datetime import datetime
 
+import pandas as pd
+
 logger = logging.getLogger(__name__)
 
 
@@ -38,6 +41,83 @@ class SnapshotStrategy(abc.ABC):
         """
         pass
     
+    def save_batched_snapshot(
+        self, 
+        table_name: str, 
+        datasource_name: str, 
+        changes: Dict[str, Any], 
+        timestamp: datetime
+    ) -> Dict[str, Any]:
+        """Save all change types in as few files as the format allows.
+        
+        Formats that cannot combine operations in one file keep the
+        per-operation layout of `save_snapshot`.
+        
+        Args:
+            table_name: Name of the table
+            datasource_name: Name of the datasource
+            changes: Changes data (added, modified, deleted)
+            timestamp: Timestamp for the snapshot
+            
+        Returns:
+            Result of the save operation
+        """
+        return self.save_snapshot(table_name, datasource_name, changes, timestamp)
+    
+    def save_snapshot_batch(
+        self, 
+        items: List[Tuple[str, str, Dict[str, Any], datetime]], 
+        max_workers: int = 4
+    ) -> List[Dict[str, Any]]:
+        """Save several snapshots, overlapping their storage uploads.
+        
+        Each snapshot is saved with `save_snapshot` on a thread pool, since
+        the work is dominated by waiting on storage PUTs. Formats that can
+        combine snapshots into fewer uploads may override this.
+        
+        Args:
+            items: Tuples of (table_name, datasource_name, changes, timestamp)
+            max_workers: Maximum snapshots saved concurrently
+            
+        Returns:
+            Results of the save operations, in the order of `items`
+        """
+        def save(item: Tuple[str, str, Dict[str, Any], datetime]) -> Dict[str, Any]:
+            try:
+                return self.save_snapshot(*item)
+            except Exception as e:
+                logger.error(f"Error saving snapshot for {item[1]}.{item[0]}: {str(e)}")
+                return {"status": "error", "message": str(e)}
+        
+        if len(items) <= 1 or max_workers <= 1:
+            return [save(item) for item in items]
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items)), thread_name_prefix="snapshot") as executor:
+            return list(executor.map(save, items))
+    
+    def open_writer(
+        self, 
+        table_name: str, 
+        datasource_name: str, 
+        timestamp: datetime, 
+        batched: bool = False
+    ) -> "SnapshotWriter":
+        """Open a writer that receives changes chunk by chunk.
+        
+        The default writer buffers chunks and saves them on close; formats
+        that can append incrementally return a streaming writer instead.
+        
+        Args:
+            table_name: Name of the table
+            datasource_name: Name of the datasource
+            timestamp: Timestamp for the snapshot
+            batched: Save with `save_batched_snapshot` instead of `save_snapshot`
+            
+        Returns:
+            Snapshot writer instance
+        """
+        return SnapshotWriter(self, table_name, datasource_name, timestamp, batched)
+    
     @abc.abstractmethod
     def get_file_extension(self) -> str:
         """Get file extension for this strategy.
@@ -47,6 +127,24 @@ class SnapshotStrategy(abc.ABC):
         """
         pass
     
+    @staticmethod
+    def _to_frame(rows: Union[pd.DataFrame, List[Dict[str, Any]]]) -> pd.DataFrame:
+        """Return change rows as a DataFrame the caller may add columns to.
+        
+        DataFrames are shallow-copied so metadata columns never leak back
+        into the CDC result they came from.
+        """
+        if isinstance(rows, pd.DataFrame):
+            return rows.copy(deep=False)
+        return pd.DataFrame(rows)
+    
+    @staticmethod
+    def _to_records(rows: Union[pd.DataFrame, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Return change rows as a list of record dicts."""
+        if isinstance(rows, pd.DataFrame):
+            return rows.to_dict("records")
+        return rows
+    
     def _generate_filename(
         self, 
         table_name: str, 
@@ -65,7 +163,11 @@ class SnapshotStrategy(abc.ABC):
         Returns:
             Generated filename
         """
-        timestamp_str = timestamp.strftime("%Y%m%d_%H%M%S")
+        # Same as strftime("%Y%m%d_%H%M%S") without parsing a format string
+        timestamp_str = "%04d%02d%02d_%02d%02d%02d" % (
+            timestamp.year, timestamp.month, timestamp.day, 
+            timestamp.hour, timestamp.minute, timestamp.second
+        )
         extension = self.get_file_extension()
         
         if suffix:
@@ -74,9 +176,112 @@ class SnapshotStrategy(abc.ABC):
             return f"snapshots/{datasource_name}/{table_name}/{timestamp_str}.{extension}"
 
 
+class SnapshotWriter:
+    """Receives change chunks for one snapshot and saves them on close.
+    
+    This base writer buffers every chunk and hands the combined changes to
+    the strategy's save method. Subclasses override `_write_frame`,
+    `_finish` and `abort` to write incrementally.
+    """
+    
+    def __init__(
+        self, 
+        strategy: SnapshotStrategy, 
+        table_name: str, 
+        datasource_name: str, 
+        timestamp: datetime, 
+        batched: bool = False
+    ):
+        """Initialize the snapshot writer.
+        
+        Args:
+            strategy: Snapshot strategy that owns the writer
+            table_name: Name of the table
+            datasource_name: Name of the datasource
+            timestamp: Timestamp for the snapshot
+            batched: Combine change types into as few files as the format allows
+        """
+        self.strategy = strategy
+        self.table_name = table_name
+        self.datasource_name = datasource_name
+        self.timestamp = timestamp
+        self.batched = batched
+        self.counts = {"added": 0, "modified": 0, "deleted": 0}
+        self._frames: Dict[str, List[pd.DataFrame]] = {"added": [], "modified": [], "deleted": []}
+    
+    def write(self, change_type: str, rows: Union[pd.DataFrame, List[Dict[str, Any]]]) -> None:
+        """Add a chunk of changed rows to the snapshot.
+        
+        Args:
+            change_type: One of 'added', 'modified' or 'deleted'
+            rows: Changed rows as a DataFrame or list of records
+        """
+        if not len(rows):
+            return
+        self.counts[change_type] += len(rows)
+        self._write_frame(change_type, self.strategy._to_frame(rows))
+    
+    def close(self) -> Dict[str, Any]:
+        """Finish the snapshot and save whatever has not been saved yet.
+        
+        Returns:
+            Result of the save operation
+        """
+        if not any(self.counts.values()):
+            self.abort()
+            return {
+                "status": "skipped",
+                "message": "No changes to save"
+            }
+        return self._finish()
+    
+    def abort(self) -> None:
+        """Discard buffered changes without saving them."""
+        self._frames = {"added": [], "modified": [], "deleted": []}
+    
+    def _write_frame(self, change_type: str, df: pd.DataFrame) -> None:
+        """Buffer a chunk until close."""
+        self._frames[change_type].append(df)
+    
+    def _finish(self) -> Dict[str, Any]:
+        """Save the buffered chunks through the strategy."""
+        changes = {
+            change_type: pd.concat(frames, ignore_index=True) if frames else []
+            for change_type, frames in self._frames.items()
+        }
+        self.abort()
+        
+        if self.batched:
+            return self.strategy.save_batched_snapshot(self.table_name, self.datasource_name, changes, self.timestamp)
+        return self.strategy.save_snapshot(self.table_name, self.datasource_name, changes, self.timestamp)
+
+
+# Format implementations subclass SnapshotStrategy, so they are imported once
+# the base classes exist; the registry is then a plain dict lookup.
+from services.strategies.json_strategy import JsonSnapshotStrategy  # noqa: E402
+from services.strategies.parquet_strategy import ParquetSnapshotStrategy  # noqa: E402
+from services.strategies.csv_strategy import CsvSnapshotStrategy  # noqa: E402
+
+_STRATEGY_REGISTRY: Dict[str, Type[SnapshotStrategy]] = {
+    "json": JsonSnapshotStrategy,
+    "parquet": ParquetSnapshotStrategy,
+    "csv": CsvSnapshotStrategy,
+}
+
+
 class SnapshotStrategyFactory:
     """Factory class for creating snapshot strategy instances."""
     
+    @staticmethod
+    def register_strategy(format_type: str, strategy_class: Type[SnapshotStrategy]) -> None:
+        """Register a snapshot strategy for an additional format.
+        
+        Args:
+            format_type: Snapshot format type, matched case-insensitively
+            strategy_class: SnapshotStrategy subclass handling the format
+        """
+        _STRATEGY_REGISTRY[format_type.lower()] = strategy_class
+    
     @staticmethod
     def create_strategy(
         format_type: str, 
@@ -93,15 +298,9 @@ class SnapshotStrategyFactory:
         """
         format_type = format_type.lower()
         
-        if format_type == "json":
-            from services.strategies.json_strategy import JsonSnapshotStrategy
-            return JsonSnapshotStrategy(storage_manager)
-        elif format_type == "parquet":
-            from services.strategies.parquet_strategy import ParquetSnapshotStrategy
-            return ParquetSnapshotStrategy(storage_manager)
-        elif format_type == "csv":
-            from services.strategies.csv_strategy import CsvSnapshotStrategy
-            return CsvSnapshotStrategy(storage_manager)
+        strategy_class = _STRATEGY_REGISTRY.get(format_type)
+        if strategy_class:
+            return strategy_class(storage_manager)
             
         logger.error(f"Unsupported snapshot format: {format_type}")
         return None
\ No newline at end of file
@@ -1,10 +1,10 @@
 import logging
-import json
 import pandas as pd
 from typing import Dict, Any
 from datetime import datetime
-from io import StringIO
+from io import BytesIO
 from services.snapshot_strategy import SnapshotStrategy
+from utils.serialization import json_dumps
 
 logger = logging.getLogger(__name__)
 
@@ -34,9 +34,9 @@ class CsvSnapshotStrategy(SnapshotStrategy):
         
         try:
             # Save added records
-            if changes.get("added"):
+            if len(changes.get("added", [])):
                 filename = self._generate_filename(table_name, datasource_name, timestamp, "added")
-                df = pd.DataFrame(changes["added"])
+                df = self._to_frame(changes["added"])
                 
                 # Add metadata columns
                 df['_cdc_operation'] = 'added'
@@ -48,9 +48,9 @@ class CsvSnapshotStrategy(SnapshotStrategy):
                     saved_files.append(filename)
             
             # Save modified records
-            if changes.get("modified"):
+            if len(changes.get("modified", [])):
                 filename = self._generate_filename(table_name, datasource_name, timestamp, "modified")
-                df = pd.DataFrame(changes["modified"])
+                df = self._to_frame(changes["modified"])
                 
                 # Add metadata columns
                 df['_cdc_operation'] = 'modified'
@@ -62,9 +62,9 @@ class CsvSnapshotStrategy(SnapshotStrategy):
                     saved_files.append(filename)
             
             # Save deleted records
-            if changes.get("deleted"):
+            if len(changes.get("deleted", [])):
                 filename = self._generate_filename(table_name, datasource_name, timestamp, "deleted")
-                df = pd.DataFrame(changes["deleted"])
+                df = self._to_frame(changes["deleted"])
                 
                 # Add metadata columns
                 df['_cdc_operation'] = 'deleted'
@@ -115,6 +115,10 @@ class CsvSnapshotStrategy(SnapshotStrategy):
     def _save_csv_file(self, filename: str, df: pd.DataFrame) -> bool:
         """Save DataFrame as CSV file to storage.
         
+        The frame is encoded straight to CSV rather than going through a
+        list of records and back. Its column list and row count are saved
+        alongside as the `_metadata` object the CSV format handler reads.
+        
         Args:
             filename: Filename to save
             df: DataFrame to save
@@ -123,16 +127,20 @@ class CsvSnapshotStrategy(SnapshotStrategy):
             True if successful, False otherwise
         """
         try:
-            # Convert DataFrame to data dict for the storage manager
             # Include metadata about the dataframe structure
-            data = {
-                "data": df.to_dict(orient='records'),
+            metadata = json_dumps({
                 "columns": df.columns.tolist(),
                 "row_count": len(df)
-            }
+            })
+            # Encode into a byte buffer directly rather than building a str first
+            csv_buffer = BytesIO()
+            df.to_csv(csv_buffer, index=False, encoding='utf-8')
             
             # Use storage manager to save file
-            return self.storage_manager.store_snapshot(filename, data, content_type='text/csv')
+            return (
+                self.storage_manager.store_snapshot(f"{filename}_metadata", metadata, content_type='application/json') and 
+                self.storage_manager.store_snapshot(filename, [csv_buffer.getbuffer()], content_type='text/csv')
+            )
             
         except Exception as e:
             logger.error(f"Error saving CSV file {filename}: {str(e)}")
@@ -1,15 +1,85 @@
 import logging
-import hashlib
 import datetime
-from typing import Dict, Any
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
-from services.cdc_strategy import CDCStrategy
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
+
+from services.cdc_strategy import CDCStrategy, ChangeStream, CHANGE_CHUNK_ROWS
+from utils.hashing import (
+    DEFAULT_HASH_ALGO, HASH_DTYPE_BACKEND, HASH_STATE_VERSION, LEGACY_HASH_ALGO, Hasher, RowHashIndex, 
+    get_hasher, hash_frame, load_row_hashes, primary_key_texts, resolve_hash_columns, resolve_hashers
+)
 
 logger = logging.getLogger(__name__)
 
+# State keys of the MOD-based layout used before keyset pagination
+_PARTITION_STATE_KEY = re.compile(r"/partition_(\d+)_of_(\d+)$")
+
+# Page states uploaded or loaded at once, so object store round-trips overlap
+STATE_IO_WORKERS = 4
+
+# Text a NULL column contributes to a row digest; CONCAT_WS would skip it,
+# so (NULL, 'a') and ('a', NULL) would digest alike
+DIGEST_NULL_MARKER = "#NULL#"
+
 
 class HashPartitionCDCStrategy(CDCStrategy):
-    """CDC strategy using hash-partition method for large tables with backend hash calculation."""
+    """CDC strategy using hash-partition method for large tables with backend hash calculation.
+    
+    The table is read in pages of `partition_size` rows using keyset
+    pagination on the primary key (`WHERE pk > :last_pk ORDER BY pk LIMIT
+    :size`), so every page is an index range scan and the table is read
+    once in total. Each page's row hashes are stored as a separate state,
+    together with a manifest listing the pages.
+    
+    Page boundaries move as rows are inserted or deleted, so a page is
+    not compared against "its" previous page. Page order is the
+    database's collation of the primary key, which Python comparisons do
+    not reproduce (case-insensitive or locale collations, timestamp or
+    Decimal keys), so rows are never assigned to previous pages by key
+    range. Instead all previous pages are loaded into one `RowHashIndex`,
+    rows are matched by key, and keys no page contained are deletions
+    once the scan is complete.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Signatures taken by has_changes, held until the scan that follows
+        self._signatures: Dict[Tuple[str, str], List[str]] = {}
+    
+    def has_changes(self, table_name: str, table_config: Dict[str, Any], datasource_name: str) -> bool:
+        """Compare a cheap table signature against the one stored last run.
+        
+        See `_table_signature` for what the signature covers.
+        
+        Args:
+            table_name: Name of the table
+            table_config: Table configuration
+            datasource_name: Name of the datasource
+            
+        Returns:
+            False if the signature equals the stored one
+        """
+        manifest = self.storage_manager.retrieve_state(f"{datasource_name}/{table_name}/page_manifest")
+        last_signature = manifest.get("signature") if manifest else None
+        if not last_signature:
+            return True
+        
+        signature = self._table_signature(table_name, table_config, datasource_name)
+        if signature is None:
+            return True
+        if signature == last_signature:
+            return False
+        
+        # Kept only for the scan that follows, which removes it
+        self._signatures[(datasource_name, table_name)] = signature
+        return True
     
     def process(self, table_name: str, table_config: Dict[str, Any], datasource_name: str) -> Dict[str, Any]:
         """Process a table using hash-partition CDC method.
@@ -22,6 +92,35 @@ class HashPartitionCDCStrategy(CDCStrategy):
         Returns:
             Results of the operation
         """
+        return self._collect_changes(self.changes_iter(table_name, table_config, datasource_name))
+    
+    def changes_iter(
+        self, 
+        table_name: str, 
+        table_config: Dict[str, Any], 
+        datasource_name: str, 
+        chunk_size: int = CHANGE_CHUNK_ROWS
+    ) -> ChangeStream:
+        """Stream hash-partition changes page by page.
+        
+        Each page's added and modified rows are yielded before the page
+        after next is fetched, so only a page of rows is held at a time,
+        next to the compact index of previous hashes; deleted keys follow
+        once the scan is complete. The next page is fetched in the
+        background while the current one is hashed.
+        
+        Args:
+            table_name: Name of the table
+            table_config: Table configuration
+            datasource_name: Name of the datasource
+            chunk_size: Maximum rows per yielded chunk
+            
+        Returns:
+            Generator of change chunks returning the result summary
+        """
+        # Taken over before any early return, so no entry is left behind
+        signature = self._signatures.pop((datasource_name, table_name), None)
+        
         hash_columns = table_config.get("hash_columns", [])
         primary_key = table_config.get("primary_key")
         partition_size = table_config.get("partition_size", 10000)
@@ -31,164 +130,405 @@ class HashPartitionCDCStrategy(CDCStrategy):
         if not primary_key:
             return {"status": "error", "message": "No primary key specified"}
             
-        # Get total count to determine partitions - SIMPLE COUNT query
+        try:
+            get_hasher(table_config.get("hash_algo", DEFAULT_HASH_ALGO))
+        except ValueError as e:
+            return {"status": "error", "message": str(e)}
+        
+        # Resolved once here and passed to every page query
         table_config_obj = self.db_manager.get_table_config(table_name)
         schema = table_config_obj.get("schema", "") if table_config_obj else ""
-        qualified_table_name = f"{schema}.{table_name}" if schema else table_name
+        qualified_table_name = self.db_manager.qualified_table_name(datasource_name, table_name, schema)
+        page_statements = self._page_statements(
+            qualified_table_name, self.db_manager.quote_identifier(datasource_name, primary_key)
+        )
         
-        count_query = f"SELECT COUNT(*) as count FROM {qualified_table_name}"
-        result = self.db_manager.execute_query(datasource_name, count_query)
-        row = result.fetchone()
-        total_rows = row[0] if row else 0
+        # Taken before the scan, so rows changed during the scan show next run
+        if signature is None:
+            signature = self._table_signature(table_name, table_config, datasource_name)
         
-        # Calculate partitions
-        num_partitions = max(1, (total_rows + partition_size - 1) // partition_size)
+        # The manifest lists the previous run's pages
+        manifest_key = f"{datasource_name}/{table_name}/page_manifest"
+        manifest = self.storage_manager.retrieve_state(manifest_key)
         
-        changes = {
-            "added": [],
-            "modified": [],
-            "deleted": []
-        }
+        # Looked up at most once, and only for legacy states with upcast keys
+        integer_keys = lru_cache(maxsize=1)(partial(
+            self.db_manager.is_integer_column, datasource_name, table_name, primary_key, schema
+        ))
         
-        # Process each partition
-        for partition_id in range(num_partitions):
-            partition_changes = self._process_partition(
-                table_name, 
-                table_config, 
-                datasource_name, 
-                partition_id, 
-                num_partitions
+        if manifest:
+            previous_algo = manifest.get("hash_algo", LEGACY_HASH_ALGO)
+            stale_keys = [page["key"] for page in manifest.get("pages", [])]
+            previous_hashes = self._load_pages(table_name, stale_keys, integer_keys)
+        else:
+            # States of the MOD-based layout are collapsed into one map
+            previous_hashes, previous_algo, stale_keys = self._collapse_previous_layout(
+                datasource_name, table_name, integer_keys
             )
+        
+        # Rows are matched against sorted arrays rather than the state dicts
+        previous_index = RowHashIndex(previous_hashes)
+        previous_hashes = None
+        
+        # States record their hash algorithm; older ones were written with MD5
+        hash_algo, hasher, previous_hasher = resolve_hashers(
+            table_config.get("hash_algo", DEFAULT_HASH_ALGO), previous_algo
+        )
+        
+        # Pages of this run are written under a new generation, so a failed
+        # run leaves the previous manifest and its pages intact
+        generation = datetime.datetime.now().strftime("%Y%m%d%H%M%S%f")
+        pages = []
+        state_writes = []
+        counts = {"added": 0, "modified": 0, "deleted": 0}
+        
+        try:
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{table_name}-page") as executor, \
+                    ThreadPoolExecutor(max_workers=STATE_IO_WORKERS, thread_name_prefix=f"{table_name}-state") as state_writer:
+                next_page = executor.submit(
+                    self._fetch_page, datasource_name, page_statements, None, partition_size
+                )
             
-            # Merge changes
-            changes["added"].extend(partition_changes.get("added", []))
-            changes["modified"].extend(partition_changes.get("modified", []))
-            changes["deleted"].extend(partition_changes.get("deleted", []))
+                while next_page is not None:
+                    df = next_page.result()
+                    if df.empty:
+                        break
+        
+                    last_pk = self._native(df[primary_key].iloc[-1])
+        
+                    # Fetch the next page while this one is hashed
+                    next_page = None
+                    if len(df) == partition_size:
+                        next_page = executor.submit(
+                            self._fetch_page, datasource_name, page_statements, last_pk, partition_size
+                        )
+                    
+                    changes, current_hashes = self._diff_page(
+                        df, 
+                        hash_columns, 
+                        primary_key, 
+                        previous_index, 
+                        hasher, 
+                        previous_hasher
+                    )
+                    
+                    # Uploaded in the background while the scan moves on
+                    page_key = f"{datasource_name}/{table_name}/page_{generation}_{len(pages)}"
+                    state_writes.append(state_writer.submit(self.storage_manager.store_state, page_key, {
+                        "row_hashes": current_hashes,
+                        "hash_algo": hash_algo,
+                        "state_version": HASH_STATE_VERSION,
+                        "processed_at": datetime.datetime.now().isoformat()
+                    }))
+                    pages.append({"key": page_key})
+                    
+                    for change_type, frame in changes.items():
+                        counts[change_type] += len(frame)
+                        for start in range(0, len(frame), chunk_size):
+                            yield change_type, frame.iloc[start:start + chunk_size]
+                
+                # The manifest may only point at pages that were stored
+                failed_writes = sum(1 for write in state_writes if not write.result())
+                if failed_writes:
+                    raise RuntimeError(f"Failed to store {failed_writes} page states of {table_name}")
+        
+        except BaseException:
+            # Drop this generation's pages; the previous manifest stays valid
+            self.storage_manager.delete_states([page["key"] for page in pages])
+            raise
+        
+        # Previous keys no page contained were deleted
+        deleted_pks = previous_index.unseen()
+        previous_index = None
+        counts["deleted"] = len(deleted_pks)
+        for start in range(0, len(deleted_pks), chunk_size):
+            yield "deleted", pd.DataFrame({"primary_key": primary_key, "value": deleted_pks[start:start + chunk_size]})
+        
+        # Switch to the new pages, then drop the old ones
+        self.storage_manager.store_state(manifest_key, {
+            "generation": generation,
+            "pages": pages,
+            "signature": signature,
+            "hash_algo": hash_algo,
+            "processed_at": datetime.datetime.now().isoformat()
+        })
+        self.storage_manager.delete_states(stale_keys)
             
         return {
             "status": "success",
             "table_name": table_name,
             "method": "hash-partition",
-            "partitions": num_partitions,
-            "changes": {
-                "added": len(changes["added"]),
-                "modified": len(changes["modified"]),
-                "deleted": len(changes["deleted"])
-            },
-            "added": changes["added"],
-            "modified": changes["modified"],
-            "deleted": changes["deleted"]
+            "partitions": len(pages),
+            "changes": counts
         }
     
-    def _process_partition(
+    @staticmethod
+    def _page_statements(qualified_table_name: str, primary_key: str) -> Tuple[TextClause, TextClause]:
+        """Build the page queries of a scan once, with the PK bound as a parameter.
+        
+        Every page then runs the same statement text, so SQLAlchemy's
+        compiled cache and the database's plan cache are reused.
+        
+        Args:
+            qualified_table_name: Quoted table name including its schema, if any
+            primary_key: Quoted primary key column
+            
+        Returns:
+            Tuple of (first page statement, following page statement)
+        """
+        # SIMPLE SELECT * per page - range scan on the PK index. Rows with
+        # a NULL key cannot be paged past and are skipped like empty keys
+        return (
+            text(
+                f"SELECT * FROM {qualified_table_name} WHERE {primary_key} IS NOT NULL "
+                f"ORDER BY {primary_key} LIMIT :page_size"
+            ),
+            text(
+                f"SELECT * FROM {qualified_table_name} WHERE {primary_key} > :last_pk "
+                f"ORDER BY {primary_key} LIMIT :page_size"
+            )
+        )
+    
+    def _fetch_page(
+        self, 
+        datasource_name: str, 
+        page_statements: Tuple[TextClause, TextClause], 
+        last_pk: Optional[Any], 
+        page_size: int
+    ) -> pd.DataFrame:
+        """Fetch the page of rows following `last_pk` in primary key order.
+        
+        Args:
+            datasource_name: Name of the datasource
+            page_statements: Statements from `_page_statements`
+            last_pk: Last primary key of the previous page, None for the first page
+            page_size: Maximum rows per page
+            
+        Returns:
+            DataFrame with the page's rows
+        """
+        first_page, next_page = page_statements
+        if last_pk is None:
+            return self.db_manager.read_query(
+                datasource_name, first_page, {"page_size": page_size}, dtype_backend=HASH_DTYPE_BACKEND
+            )
+        return self.db_manager.read_query(
+            datasource_name, next_page, {"last_pk": last_pk, "page_size": page_size}, dtype_backend=HASH_DTYPE_BACKEND
+        )
+        
+    def _load_pages(
         self, 
         table_name: str, 
-        table_config: Dict[str, Any], 
-        datasource_name: str,
-        partition_id: int,
-        total_partitions: int
+        page_keys: List[str], 
+        integer_keys: Optional[Callable[[], bool]] = None
     ) -> Dict[str, Any]:
-        """Process a specific partition of a table.
+        """Load the row hashes of every page of the previous run into one map.
         
         Args:
             table_name: Name of the table
-            table_config: Table configuration
-            datasource_name: Name of the datasource
-            partition_id: ID of the partition to process
-            total_partitions: Total number of partitions
+            page_keys: State keys of the previous run's pages
+            integer_keys: Passed to `load_row_hashes`
             
         Returns:
-            Dictionary with changes for this partition
+            Row hashes keyed by primary key
         """
-        hash_columns = table_config.get("hash_columns", [])
-        primary_key = table_config.get("primary_key")
+        previous_hashes: Dict[str, Any] = {}
+        with ThreadPoolExecutor(max_workers=STATE_IO_WORKERS, thread_name_prefix=f"{table_name}-state") as state_reader:
+            for state in state_reader.map(self.storage_manager.retrieve_state, page_keys):
+                previous_hashes.update(load_row_hashes(state, integer_keys))
+        return previous_hashes
+    
+    def _diff_page(
+        self, 
+        df: pd.DataFrame, 
+        hash_columns: List[str], 
+        primary_key: str, 
+        previous_index: RowHashIndex, 
+        hasher: Hasher, 
+        previous_hasher: Hasher
+    ) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Any]]:
+        """Hash a page and compare it with the previous hashes.
         
-        # Get previous state with row hashes for this partition
-        state_key = f"{datasource_name}/{table_name}/partition_{partition_id}_of_{total_partitions}"
-        previous_state = self.storage_manager.retrieve_state(state_key)
-        previous_hashes = previous_state.get("row_hashes", {}) if previous_state else {}
+        Matched keys are marked seen in `previous_index`, and deletions are
+        left for the caller to take from it once the scan is complete. Rows
+        without a primary key value are skipped with a warning.
         
-        # Get table config for schema
-        table_config_obj = self.db_manager.get_table_config(table_name)
-        schema = table_config_obj.get("schema", "") if table_config_obj else ""
-        qualified_table_name = f"{schema}.{table_name}" if schema else table_name
+        Args:
+            df: Rows of the page
+            hash_columns: Configured hash columns
+            primary_key: Primary key column
+            previous_index: Row hashes of the previous run
+            hasher: Hash constructor for storing
+            previous_hasher: Hash constructor for comparing
+            
+        Returns:
+            Tuple of (added and modified DataFrames, row hashes of the page)
+        """
+        # Hash the page in one pass di BACKEND (bukan di database)
+        row_columns = resolve_hash_columns(hash_columns, df.columns)
+        pk_keys = primary_key_texts(df[primary_key])
+        row_hashes = hash_frame(df, row_columns, hasher)
+        
+        # After an algorithm switch, compare using the previous state's algorithm
+        compare_hashes = row_hashes if previous_hasher is hasher else hash_frame(df, row_columns, previous_hasher)
+        
+        # Compare the whole page at once, matching rows by key
+        added, modified = previous_index.classify(pk_keys, compare_hashes)
         
-        # Build partition query - SIMPLE SELECT * dengan WHERE partition clause
-        partition_clause = f"MOD(ABS(CAST(COALESCE({primary_key}, 0) AS INTEGER)), {total_partitions}) = {partition_id}"
-        query = f"SELECT * FROM {qualified_table_name} WHERE {partition_clause}"
+        valid = pk_keys != ""
+        for position in np.flatnonzero(~valid):
+            logger.warning(f"Row missing primary key value at page position {position}")
         
-        # Process current data
-        current_hashes = {}
+        current_hashes = {
+            key: row_hash for key, row_hash, keep in zip(pk_keys.tolist(), row_hashes, valid.tolist()) if keep
+        }
+        
+        # Only the changed rows are sliced out of the page
         changes = {
-            "added": [],
-            "modified": [],
-            "deleted": []
+            "added": df.iloc[np.flatnonzero(added & valid)],
+            "modified": df.iloc[np.flatnonzero(modified & valid)]
         }
+        return changes, current_hashes
         
-        # Execute simple SELECT query
-        result = self.db_manager.execute_query(datasource_name, query)
+    def _collapse_previous_layout(
+        self, 
+        datasource_name: str, 
+        table_name: str, 
+        integer_keys: Optional[Callable[[], bool]] = None
+    ) -> Tuple[Dict[str, Any], Optional[str], List[str]]:
+        """Merge partition states written by the MOD-based layout.
         
-        # Process rows dan calculate hash di BACKEND (bukan di database)
-        for row in result:
-            row_dict = dict(row._mapping) if hasattr(row, '_mapping') else dict(row)
-            pk_value = str(row_dict.get(primary_key, ""))
-            
-            if not pk_value:
-                logger.warning(f"Row missing primary key value: {row_dict}")
-                continue
-            
-            # Hash calculation di BACKEND - bukan di database
-            row_hash = self._calculate_row_hash(row_dict, hash_columns)
-            current_hashes[pk_value] = row_hash
+        Those state keys embed the partition count, and several counts can
+        be left behind if the table grew across a partition boundary. The
+        most recently written layout is collapsed into one map keyed by PK,
+        which the first keyset run matches against.
+
+        Args:
+            datasource_name: Name of the datasource
+            table_name: Name of the table
+            integer_keys: Passed to `load_row_hashes`
             
-            # Compare with previous hash
-            if pk_value in previous_hashes:
-                if row_hash != previous_hashes[pk_value]:
-                    changes["modified"].append(row_dict)
-            else:
-                changes["added"].append(row_dict)
+        Returns:
+            Tuple of (collapsed row hashes, hash algorithm of the collapsed
+            states or None if there are none, state keys to delete)
+        """
+        layouts: Dict[int, List[str]] = {}
+        for state_key in self.storage_manager.list_states(f"{datasource_name}/{table_name}/partition_"):
+            match = _PARTITION_STATE_KEY.search(state_key)
+            if match:
+                layouts.setdefault(int(match.group(2)), []).append(state_key)
         
-        # Find deleted rows
-        for pk_value in previous_hashes:
-            if pk_value not in current_hashes:
-                changes["deleted"].append({"primary_key": primary_key, "value": pk_value})
+        stale_keys = [key for keys in layouts.values() for key in keys]
+        if not stale_keys:
+            return {}, None, stale_keys
         
-        # Store the new state
-        new_state = {
-            "row_hashes": current_hashes,
-            "processed_at": datetime.datetime.now().isoformat()
-        }
-        self.storage_manager.store_state(state_key, new_state)
+        # Use the most recently written layout if several are left behind
+        newest_processed_at = ""
+        carried_hashes: Dict[str, Any] = {}
+        carried_algo = LEGACY_HASH_ALGO
+        for count, keys in layouts.items():
+            states = [self.storage_manager.retrieve_state(key) or {} for key in keys]
+            processed_at = max(state.get("processed_at", "") for state in states)
+            if processed_at >= newest_processed_at:
+                newest_processed_at = processed_at
+                carried_algo = states[0].get("hash_algo", LEGACY_HASH_ALGO)
+                carried_hashes = {}
+                for state in states:
+                    carried_hashes.update(load_row_hashes(state, integer_keys))
         
-        return changes
+        logger.info(f"Migrating {len(stale_keys)} partition states of {table_name} to keyset pages, "
+                    f"matching against {len(carried_hashes)} previously seen rows")
+        return carried_hashes, carried_algo, stale_keys
     
-    def _calculate_row_hash(self, row_dict: Dict[str, Any], hash_columns: list) -> str:
-        """Calculate hash value for a row based on specified columns.
+    def _table_signature(
+        self, 
+        table_name: str, 
+        table_config: Dict[str, Any], 
+        datasource_name: str
+    ) -> Optional[List[str]]:
+        """Take a table signature with one aggregate query.
         
-        IMPORTANT: Hash calculation dilakukan di BACKEND (Python level), 
-        bukan di database level untuk menghindari query yang berat.
+        Opt-in through `change_check`: the signature is the row count plus
+        MAX(timestamp_column) for "timestamp", or an XOR of per-row hashes
+        computed by the database (PostgreSQL 14+ and MySQL) for "digest".
+        The digest still scans the table, but returns one row instead of
+        every row.
+        
+        Both can miss changes: "timestamp" misses updates that do not
+        raise the maximum and deletes balanced by inserts, and "digest"
+        uses 32-bit row hashes, so two changes can cancel out in the XOR.
         
         Args:
-            row_dict: Row data as dictionary
-            hash_columns: List of column names to include in hash
+            table_name: Name of the table
+            table_config: Table configuration
+            datasource_name: Name of the datasource
             
         Returns:
-            Hash string
+            Signature values as strings, or None if not available
         """
-        hash_values = []
+        schema = table_config.get("schema", "")
+        qualified_table_name = self.db_manager.qualified_table_name(datasource_name, table_name, schema)
+        change_check = table_config.get("change_check")
+        timestamp_column = table_config.get("timestamp_column")
         
-        # Special case: if hash_columns contains "*", use all columns
-        if "*" in hash_columns:
-            for col, val in sorted(row_dict.items()):
-                # Convert to string and handle None values
-                hash_values.append(str(val if val is not None else ""))
+        if change_check == "timestamp" and timestamp_column:
+            change_expr = f"MAX({self.db_manager.quote_identifier(datasource_name, timestamp_column)})"
+        elif change_check == "digest":
+            change_expr = self._digest_expression(table_name, table_config, datasource_name)
+            if change_expr is None:
+                return None
         else:
-            for col in hash_columns:
-                if col in row_dict:
-                    # Convert to string and handle None values
-                    val = row_dict.get(col)
-                    hash_values.append(str(val if val is not None else ""))
-        
-        # Join with delimiter and calculate MD5 hash di BACKEND
-        hash_string = "|".join(hash_values)
-        return hashlib.md5(hash_string.encode('utf-8')).hexdigest()
\ No newline at end of file
+            return None
+        
+        query = f"SELECT COUNT(*) AS row_count, {change_expr} AS change_mark FROM {qualified_table_name} t"
+        result = self.db_manager.execute_query(datasource_name, query)
+        row = result.fetchone() if result is not None else None
+        return [str(value) for value in row] if row else None
+    
+    def _digest_expression(
+        self, 
+        table_name: str, 
+        table_config: Dict[str, Any], 
+        datasource_name: str
+    ) -> Optional[str]:
+        """Build the dialect's XOR-of-row-hashes aggregate over the hash columns.
+        
+        The primary key is always part of each row's text, so values
+        swapped between rows do not cancel out in the XOR.
+        """
+        hash_columns = table_config.get("hash_columns", [])
+        primary_key = table_config.get("primary_key")
+        dialect = self.db_manager.get_dialect(datasource_name)
+        
+        if "*" not in hash_columns and primary_key not in hash_columns:
+            hash_columns = [primary_key] + list(hash_columns)
+        
+        if dialect == "postgresql":
+            # A row's composite text keeps NULLs in their position
+            if "*" in hash_columns:
+                row_text = "CAST(t AS TEXT)"
+            else:
+                row_text = self._row_text(datasource_name, hash_columns, "TEXT")
+            return f"BIT_XOR(hashtext({row_text}))"
+        
+        if dialect == "mysql":
+            if "*" in hash_columns:
+                table_info = self.db_manager.get_table_info(datasource_name, table_name)
+                hash_columns = sorted(column["name"] for column in table_info.get("columns", []))
+            return f"BIT_XOR(CRC32({self._row_text(datasource_name, hash_columns, 'CHAR')}))"
+        
+        logger.warning(f"Digest change check is not supported for {dialect}, scanning {table_name} every run")
+        return None
+    
+    def _row_text(self, datasource_name: str, columns: List[str], text_type: str) -> str:
+        """Join columns into a row's text, each quoted and with NULLs marked."""
+        return "CONCAT_WS('|', {})".format(", ".join(
+            f"COALESCE(CAST({self.db_manager.quote_identifier(datasource_name, column)} AS {text_type}), "
+            f"'{DIGEST_NULL_MARKER}')"
+            for column in columns
+        ))
+    
+    @staticmethod
+    def _native(value: Any) -> Any:
+        """Convert a numpy scalar primary key to its Python value."""
+        return value.item() if hasattr(value, "item") else value
@@ -1,9 +1,17 @@
 import logging
-import hashlib
 import datetime
-from typing import Dict, List, Any
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Any
 
-from services.cdc_strategy import CDCStrategy
+import numpy as np
+import pandas as pd
+
+from services.cdc_strategy import CDCStrategy, ChangeStream, CHANGE_CHUNK_ROWS
+from utils.hashing import (
+    DEFAULT_HASH_ALGO, HASH_DTYPE_BACKEND, HASH_STATE_VERSION, LEGACY_HASH_ALGO, RowHashIndex, 
+    digest_array, hash_frame, load_row_hashes, primary_key_texts, resolve_hash_columns, resolve_hashers
+)
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +30,31 @@ class HashCDCStrategy(CDCStrategy):
         Returns:
             Results of the operation
         """
+        return self._collect_changes(self.changes_iter(table_name, table_config, datasource_name))
+    
+    def changes_iter(
+        self, 
+        table_name: str, 
+        table_config: Dict[str, Any], 
+        datasource_name: str, 
+        chunk_size: int = CHANGE_CHUNK_ROWS
+    ) -> ChangeStream:
+        """Stream hash-based changes batch by batch.
+        
+        Added and modified rows are yielded as each database batch is
+        hashed; deleted keys follow once the scan is complete. The next
+        batch is fetched on a background thread while the current one is
+        hashed.
+        
+        Args:
+            table_name: Name of the table
+            table_config: Table configuration
+            datasource_name: Name of the datasource
+            chunk_size: Maximum rows per yielded chunk
+            
+        Returns:
+            Generator of change chunks returning the result summary
+        """
         hash_columns = table_config.get("hash_columns", [])
         primary_key = table_config.get("primary_key")
         
@@ -33,49 +66,94 @@ class HashCDCStrategy(CDCStrategy):
         # Get previous state with row hashes
         state_key = f"{datasource_name}/{table_name}/hash_state"
         previous_state = self.storage_manager.retrieve_state(state_key)
-        previous_hashes = previous_state.get("row_hashes", {}) if previous_state else {}
         
-        # Process current data
-        current_hashes = {}
-        changes = {
-            "added": [],
-            "modified": [],
-            "deleted": []
-        }
+        # States record their hash algorithm; older ones were written with MD5
+        try:
+            hash_algo, hasher, previous_hasher = resolve_hashers(
+                table_config.get("hash_algo", DEFAULT_HASH_ALGO),
+                previous_state.get("hash_algo", LEGACY_HASH_ALGO) if previous_state else None
+            )
+        except ValueError as e:
+            return {"status": "error", "message": str(e)}
+        
+        # Batches are matched against sorted arrays rather than the state dict
+        integer_keys = partial(
+            self.db_manager.is_integer_column, datasource_name, table_name, primary_key, table_config.get("schema")
+        )
+        previous_hashes = RowHashIndex(load_row_hashes(previous_state, integer_keys))
+        previous_state = None
+        
+        # Process current data; changed rows are yielded as DataFrame slices.
+        # Keys and hashes are kept as per-batch arrays until the state is stored
+        current_keys, current_digests = [], []
+        counts = {"added": 0, "modified": 0, "deleted": 0}
         
         # Process data in batches - SIMPLE SELECT * query saja
-        for batch in self.db_manager.fetch_data_in_batches(datasource_name, table_name):
-            if batch.empty:
-                continue
-                
-            # Calculate hash for each row di BACKEND (bukan di DB)
-            for _, row in batch.iterrows():
-                row_dict = row.to_dict()
-                pk_value = str(row_dict.get(primary_key, ""))
+        batches = self.db_manager.fetch_data_in_batches(
+            datasource_name, table_name, dtype_backend=HASH_DTYPE_BACKEND
+        )
+        try:
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{table_name}-batch") as executor:
+                next_batch = executor.submit(next, batches, None)
+            
+                while True:
+                    batch = next_batch.result()
+                    if batch is None:
+                        break
                 
-                if not pk_value:
-                    logger.warning(f"Row missing primary key value: {row_dict}")
-                    continue
+                    # Fetch the next batch while this one is hashed
+                    next_batch = executor.submit(next, batches, None)
+                    if batch.empty:
+                        continue
+            
+                    # Calculate hash for each row di BACKEND (bukan di DB)
+                    row_columns = resolve_hash_columns(hash_columns, batch.columns)
+                    pk_keys = primary_key_texts(batch[primary_key])
+                    row_hashes = hash_frame(batch, row_columns, hasher)
                 
-                # Hash calculation di BACKEND - bukan di database
-                row_hash = self._calculate_row_hash(row_dict, hash_columns)
-                current_hashes[pk_value] = row_hash
+                    # After an algorithm switch, compare using the previous state's algorithm
+                    compare_hashes = row_hashes if previous_hasher is hasher else hash_frame(batch, row_columns, previous_hasher)
                 
-                # Compare with previous hash
-                if pk_value in previous_hashes:
-                    if row_hash != previous_hashes[pk_value]:
-                        changes["modified"].append(row_dict)
-                else:
-                    changes["added"].append(row_dict)
+                    # Compare with previous hashes, the whole batch at once
+                    added, modified = previous_hashes.classify(pk_keys, compare_hashes)
+            
+                    valid = pk_keys != ""
+                    for position in np.flatnonzero(~valid):
+                        logger.warning(f"Row missing primary key value at batch position {position}")
+            
+                    current_keys.append(pk_keys[valid])
+                    current_digests.append(digest_array(row_hashes)[valid])
+                    
+                    added_positions = np.flatnonzero(added & valid)
+                    modified_positions = np.flatnonzero(modified & valid)
+                    
+                    for change_type, positions in (("added", added_positions), ("modified", modified_positions)):
+                        for start in range(0, len(positions), chunk_size):
+                            chunk = positions[start:start + chunk_size]
+                            counts[change_type] += len(chunk)
+                            yield change_type, batch.iloc[chunk]
+        finally:
+            batches.close()
         
-        # Find deleted rows
-        for pk_value in previous_hashes:
-            if pk_value not in current_hashes:
-                changes["deleted"].append({"primary_key": primary_key, "value": pk_value})
+        # Find deleted rows: previous keys no batch contained
+        deleted_pks = previous_hashes.unseen()
+        previous_hashes = None
+        counts["deleted"] = len(deleted_pks)
+        
+        for start in range(0, len(deleted_pks), chunk_size):
+            yield "deleted", pd.DataFrame({"primary_key": primary_key, "value": deleted_pks[start:start + chunk_size]})
+        
+        # Store the new state; a key seen twice keeps its last hash. Each
+        # batch's arrays are released as soon as they are in the map
+        current_hashes = {}
+        for position in range(len(current_keys)):
+            current_hashes.update(zip(current_keys[position].tolist(), current_digests[position].tolist()))
+            current_keys[position] = current_digests[position] = None
         
-        # Store the new state
         new_state = {
             "row_hashes": current_hashes,
+            "hash_algo": hash_algo,
+            "state_version": HASH_STATE_VERSION,
             "processed_at": datetime.datetime.now().isoformat()
         }
         self.storage_manager.store_state(state_key, new_state)
@@ -84,43 +162,5 @@ class HashCDCStrategy(CDCStrategy):
             "status": "success",
             "table_name": table_name,
             "method": "hash",
-            "changes": {
-                "added": len(changes["added"]),
-                "modified": len(changes["modified"]),
-                "deleted": len(changes["deleted"])
-            },
-            "added": changes["added"],
-            "modified": changes["modified"],
-            "deleted": changes["deleted"]
+            "changes": counts
         }
-        
-    def _calculate_row_hash(self, row_dict: Dict[str, Any], hash_columns: List[str]) -> str:
-        """Calculate hash value for a row based on specified columns.
-        
-        IMPORTANT: Hash calculation dilakukan di BACKEND (Python level), 
-        bukan di database level untuk menghindari query yang berat.
-        
-        Args:
-            row_dict: Row data as dictionary
-            hash_columns: List of column names to include in hash
-            
-        Returns:
-            Hash string
-        """
-        hash_values = []
-        
-        # Special case: if hash_columns contains "*", use all columns
-        if "*" in hash_columns:
-            for col, val in sorted(row_dict.items()):
-                # Convert to string and handle None values
-                hash_values.append(str(val if val is not None else ""))
-        else:
-            for col in hash_columns:
-                if col in row_dict:
-                    # Convert to string and handle None values
-                    val = row_dict.get(col)
-                    hash_values.append(str(val if val is not None else ""))
-        
-        # Join with delimiter and calculate MD5 hash di BACKEND
-        hash_string = "|".join(hash_values)
-        return hashlib.md5(hash_string.encode('utf-8')).hexdigest()
\ No newline at end of file
@@ -1,8 +1,9 @@
 import logging
-import json
-from typing import Dict, Any
+import pandas as pd
+from typing import Dict, Any, List
 from datetime import datetime
-from services.snapshot_strategy import SnapshotStrategy
+from services.snapshot_strategy import SnapshotStrategy, SnapshotWriter
+from utils.serialization import json_dumps
 
 logger = logging.getLogger(__name__)
 
@@ -28,80 +29,15 @@ class JsonSnapshotStrategy(SnapshotStrategy):
         Returns:
             Result of the save operation
         """
-        saved_files = []
+        writer = self.open_writer(table_name, datasource_name, timestamp)
         
         try:
-            # Save added records
-            if changes.get("added"):
-                filename = self._generate_filename(table_name, datasource_name, timestamp, "added")
-                data = {
-                    "table_name": table_name,
-                    "datasource": datasource_name,
-                    "timestamp": timestamp.isoformat(),
-                    "operation": "added",
-                    "count": len(changes["added"]),
-                    "data": changes["added"]
-                }
-                
-                if self._save_json_file(filename, data):
-                    saved_files.append(filename)
-            
-            # Save modified records
-            if changes.get("modified"):
-                filename = self._generate_filename(table_name, datasource_name, timestamp, "modified")
-                data = {
-                    "table_name": table_name,
-                    "datasource": datasource_name,
-                    "timestamp": timestamp.isoformat(),
-                    "operation": "modified",
-                    "count": len(changes["modified"]),
-                    "data": changes["modified"]
-                }
-                
-                if self._save_json_file(filename, data):
-                    saved_files.append(filename)
-            
-            # Save deleted records
-            if changes.get("deleted"):
-                filename = self._generate_filename(table_name, datasource_name, timestamp, "deleted")
-                data = {
-                    "table_name": table_name,
-                    "datasource": datasource_name,
-                    "timestamp": timestamp.isoformat(),
-                    "operation": "deleted",
-                    "count": len(changes["deleted"]),
-                    "data": changes["deleted"]
-                }
-                
-                if self._save_json_file(filename, data):
-                    saved_files.append(filename)
-            
-            # Save summary/manifest file
-            summary_filename = self._generate_filename(table_name, datasource_name, timestamp, "summary")
-            summary_data = {
-                "table_name": table_name,
-                "datasource": datasource_name,
-                "timestamp": timestamp.isoformat(),
-                "format": "json",
-                "files": saved_files,
-                "summary": {
-                    "added": len(changes.get("added", [])),
-                    "modified": len(changes.get("modified", [])),
-                    "deleted": len(changes.get("deleted", []))
-                }
-            }
-            
-            if self._save_json_file(summary_filename, summary_data):
-                saved_files.append(summary_filename)
-            
-            return {
-                "status": "success",
-                "format": "json",
-                "files_saved": saved_files,
-                "total_files": len(saved_files)
-            }
+            for operation in ("added", "modified", "deleted"):
+                writer.write(operation, changes.get(operation, []))
+            return writer.close()
             
         except Exception as e:
+            writer.abort()
             logger.error(f"Error saving JSON snapshot: {str(e)}")
             return {
                 "status": "error",
@@ -109,6 +45,16 @@ class JsonSnapshotStrategy(SnapshotStrategy):
                 "message": str(e)
             }
     
+    def open_writer(
+        self, 
+        table_name: str, 
+        datasource_name: str, 
+        timestamp: datetime, 
+        batched: bool = False
+    ) -> SnapshotWriter:
+        """Open a writer that encodes chunks into the JSON files as they arrive."""
+        return JsonSnapshotWriter(self, table_name, datasource_name, timestamp, batched)
+    
     def get_file_extension(self) -> str:
         """Get file extension for JSON format."""
         return "json"
@@ -128,4 +74,76 @@ class JsonSnapshotStrategy(SnapshotStrategy):
             return self.storage_manager.store_snapshot(filename, data, content_type='application/json')
         except Exception as e:
             logger.error(f"Error saving JSON file {filename}: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+
+
+class JsonSnapshotWriter(SnapshotWriter):
+    """Encodes change chunks into per-operation JSON files as they arrive.
+    
+    Each chunk is serialized to bytes straight away and appended to its
+    file's `data` array, so only the encoded output is held rather than
+    every changed row as records. The file layout is the one `save_snapshot`
+    always wrote, with `count` placed after `data` since it is only known
+    once the last chunk has been written.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._parts: Dict[str, List[bytes]] = {}
+    
+    def _write_frame(self, change_type: str, df: pd.DataFrame) -> None:
+        """Encode a chunk and append it to the file for its operation."""
+        if change_type not in self._parts:
+            header = {
+                "table_name": self.table_name,
+                "datasource": self.datasource_name,
+                "timestamp": self.timestamp.isoformat(),
+                "operation": change_type
+            }
+            # Open the object and its data array: {"table_name":...,"data":[
+            self._parts[change_type] = [json_dumps(header)[:-1] + b',"data":[']
+        else:
+            self._parts[change_type].append(b",")
+        
+        # Strip the brackets of the encoded records list
+        self._parts[change_type].append(json_dumps(self.strategy._to_records(df))[1:-1])
+    
+    def _finish(self) -> Dict[str, Any]:
+        """Upload every file and save the summary."""
+        saved_files = []
+        
+        for operation in ("added", "modified", "deleted"):
+            parts = self._parts.pop(operation, None)
+            if parts is None:
+                continue
+            
+            parts.append(b'],"count":' + str(self.counts[operation]).encode() + b"}")
+            filename = self.strategy._generate_filename(self.table_name, self.datasource_name, self.timestamp, operation)
+            # The parts are uploaded in sequence rather than joined into a second copy
+            if self.strategy.storage_manager.store_snapshot(filename, parts, content_type='application/json'):
+                saved_files.append(filename)
+        
+        # Save summary/manifest file
+        summary_filename = self.strategy._generate_filename(self.table_name, self.datasource_name, self.timestamp, "summary")
+        summary_data = {
+            "table_name": self.table_name,
+            "datasource": self.datasource_name,
+            "timestamp": self.timestamp.isoformat(),
+            "format": "json",
+            "files": list(saved_files),
+            "summary": dict(self.counts)
+        }
+        
+        if self.strategy._save_json_file(summary_filename, summary_data):
+            saved_files.append(summary_filename)
+        
+        return {
+            "status": "success",
+            "format": "json",
+            "files_saved": saved_files,
+            "total_files": len(saved_files)
+        }
+    
+    def abort(self) -> None:
+        """Drop encoded files without uploading them."""
+        self._parts = {}
@@ -1,13 +1,18 @@
 import logging
-import json
 import pandas as pd
-from typing import Dict, Any
+import pyarrow as pa
+import pyarrow.parquet as pq
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 from io import BytesIO
-from services.snapshot_strategy import SnapshotStrategy
+from services.snapshot_strategy import SnapshotStrategy, SnapshotWriter
+from utils.formats import PARQUET_WRITE_OPTIONS
 
 logger = logging.getLogger(__name__)
 
+# Rows buffered per Parquet row group before it is written out
+ROW_GROUP_ROWS = 65536
+
 
 class ParquetSnapshotStrategy(SnapshotStrategy):
     """Snapshot strategy for Parquet format."""
@@ -30,77 +35,63 @@ class ParquetSnapshotStrategy(SnapshotStrategy):
         Returns:
             Result of the save operation
         """
-        saved_files = []
+        return self._write_changes(table_name, datasource_name, changes, timestamp, batched=False)
+    
+    def save_batched_snapshot(
+        self, 
+        table_name: str, 
+        datasource_name: str, 
+        changes: Dict[str, Any], 
+        timestamp: datetime
+    ) -> Dict[str, Any]:
+        """Save added, modified and deleted records as a single Parquet file.
         
-        try:
-            # Save added records
-            if changes.get("added"):
-                filename = self._generate_filename(table_name, datasource_name, timestamp, "added")
-                df = pd.DataFrame(changes["added"])
-                
-                # Add metadata columns
-                df['_cdc_operation'] = 'added'
-                df['_cdc_timestamp'] = timestamp.isoformat()
-                df['_cdc_table'] = table_name
-                df['_cdc_datasource'] = datasource_name
-                
-                if self._save_parquet_file(filename, df):
-                    saved_files.append(filename)
-            
-            # Save modified records
-            if changes.get("modified"):
-                filename = self._generate_filename(table_name, datasource_name, timestamp, "modified")
-                df = pd.DataFrame(changes["modified"])
-                
-                # Add metadata columns
-                df['_cdc_operation'] = 'modified'
-                df['_cdc_timestamp'] = timestamp.isoformat()
-                df['_cdc_table'] = table_name
-                df['_cdc_datasource'] = datasource_name
-                
-                if self._save_parquet_file(filename, df):
-                    saved_files.append(filename)
-            
-            # Save deleted records
-            if changes.get("deleted"):
-                filename = self._generate_filename(table_name, datasource_name, timestamp, "deleted")
-                df = pd.DataFrame(changes["deleted"])
-                
-                # Add metadata columns
-                df['_cdc_operation'] = 'deleted'
-                df['_cdc_timestamp'] = timestamp.isoformat()
-                df['_cdc_table'] = table_name
-                df['_cdc_datasource'] = datasource_name
-                
-                if self._save_parquet_file(filename, df):
-                    saved_files.append(filename)
-            
-            # Save summary as JSON (parquet tidak cocok untuk summary)
-            summary_filename = self._generate_filename(table_name, datasource_name, timestamp, "summary").replace('.parquet', '.json')
-            summary_data = {
-                "table_name": table_name,
-                "datasource": datasource_name,
-                "timestamp": timestamp.isoformat(),
-                "format": "parquet",
-                "files": saved_files,
-                "summary": {
-                    "added": len(changes.get("added", [])),
-                    "modified": len(changes.get("modified", [])),
-                    "deleted": len(changes.get("deleted", []))
-                }
-            }
-            
-            if self._save_json_file(summary_filename, summary_data):
-                saved_files.append(summary_filename)
+        Rows are tagged through the `_cdc_operation` column, so one object
+        replaces the three per-operation files written by `save_snapshot`.
+        
+        Args:
+            table_name: Name of the table
+            datasource_name: Name of the datasource
+            changes: Changes data (added, modified, deleted)
+            timestamp: Timestamp for the snapshot
             
-            return {
-                "status": "success",
-                "format": "parquet",
-                "files_saved": saved_files,
-                "total_files": len(saved_files)
-            }
+        Returns:
+            Result of the save operation
+        """
+        return self._write_changes(table_name, datasource_name, changes, timestamp, batched=True)
+    
+    def open_writer(
+        self, 
+        table_name: str, 
+        datasource_name: str, 
+        timestamp: datetime, 
+        batched: bool = False
+    ) -> SnapshotWriter:
+        """Open a writer that appends chunks to Parquet row groups as they arrive."""
+        return ParquetSnapshotWriter(self, table_name, datasource_name, timestamp, batched)
+    
+    def get_file_extension(self) -> str:
+        """Get file extension for Parquet format."""
+        return "parquet"
+    
+    def _write_changes(
+        self, 
+        table_name: str, 
+        datasource_name: str, 
+        changes: Dict[str, Any], 
+        timestamp: datetime, 
+        batched: bool
+    ) -> Dict[str, Any]:
+        """Save an in-memory changes dict through the streaming writer."""
+        writer = self.open_writer(table_name, datasource_name, timestamp, batched)
+        
+        try:
+            for operation in ("added", "modified", "deleted"):
+                writer.write(operation, changes.get(operation, []))
+            return writer.close()
             
         except Exception as e:
+            writer.abort()
             logger.error(f"Error saving Parquet snapshot: {str(e)}")
             return {
                 "status": "error",
@@ -108,35 +99,36 @@ class ParquetSnapshotStrategy(SnapshotStrategy):
                 "message": str(e)
             }
     
-    def get_file_extension(self) -> str:
-        """Get file extension for Parquet format."""
-        return "parquet"
-    
-    def _save_parquet_file(self, filename: str, df: pd.DataFrame) -> bool:
-        """Save DataFrame as Parquet file to storage.
+    def _save_summary(
+        self, 
+        table_name: str, 
+        datasource_name: str, 
+        counts: Dict[str, int], 
+        timestamp: datetime,
+        saved_files: List[str]
+    ) -> Optional[str]:
+        """Save the JSON summary/manifest for a snapshot.
         
-        Args:
-            filename: Filename to save
-            df: DataFrame to save
-            
         Returns:
-            True if successful, False otherwise
+            Summary filename if saved, None otherwise
         """
-        try:
-            # Convert DataFrame to data dict for the storage manager
-            # Include metadata about the dataframe structure
-            data = {
-                "data": df.to_dict(orient='records'),
-                "columns": df.columns.tolist(),
-                "row_count": len(df)
+        summary_filename = self._generate_filename(table_name, datasource_name, timestamp, "summary").replace('.parquet', '.json')
+        summary_data = {
+            "table_name": table_name,
+            "datasource": datasource_name,
+            "timestamp": timestamp.isoformat(),
+            "format": "parquet",
+            "files": list(saved_files),
+            "summary": {
+                "added": counts.get("added", 0),
+                "modified": counts.get("modified", 0),
+                "deleted": counts.get("deleted", 0)
             }
-            
-            # Use storage manager to save file
-            return self.storage_manager.store_snapshot(filename, data, content_type='application/octet-stream')
-            
-        except Exception as e:
-            logger.error(f"Error saving Parquet file {filename}: {str(e)}")
-            return False
+        }
+        
+        if self._save_json_file(summary_filename, summary_data):
+            return summary_filename
+        return None
     
     def _save_json_file(self, filename: str, data: Dict[str, Any]) -> bool:
         """Save data as JSON file to storage (for summary).
@@ -154,4 +146,147 @@ class ParquetSnapshotStrategy(SnapshotStrategy):
             
         except Exception as e:
             logger.error(f"Error saving JSON file {filename}: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+
+
+class ParquetSnapshotWriter(SnapshotWriter):
+    """Writes change chunks into Parquet row groups as they arrive.
+    
+    Chunks are converted to Arrow and buffered until a row group of
+    `ROW_GROUP_ROWS` rows is ready, so only the encoded file and one row
+    group are held in memory. Per-operation files are written unless the
+    writer is batched, in which case every operation goes to one
+    `_changes` file and deleted rows carry their key in the primary key
+    column. A chunk whose schema cannot be cast to the open file's schema
+    starts a new `_partN` file.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._parts: Dict[str, Dict[str, Any]] = {}
+        self._part_counts: Dict[str, int] = {}
+        self._saved_files: List[str] = []
+    
+    def _write_frame(self, change_type: str, df: pd.DataFrame) -> None:
+        """Append a chunk to the file for its operation."""
+        group = "changes" if self.batched else change_type
+        
+        if self.batched and change_type == "deleted":
+            # Deleted chunks only carry keys; put them in the key column
+            df = pd.DataFrame({df["primary_key"].iloc[0]: df["value"].to_numpy()})
+        
+        # Add metadata columns
+        df['_cdc_operation'] = change_type
+        df['_cdc_timestamp'] = self.timestamp.isoformat()
+        df['_cdc_table'] = self.table_name
+        df['_cdc_datasource'] = self.datasource_name
+        
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        part = self._parts.get(group)
+        
+        if part is not None and not table.schema.equals(part["schema"]):
+            conformed = self._conform(table, part["schema"])
+            if conformed is None:
+                logger.warning(f"Schema changed within {group} snapshot of {self.table_name}, starting a new file")
+                self._finish_part(group)
+                part = None
+            else:
+                table = conformed
+        
+        if part is None:
+            part = self._open_part(group, table.schema)
+        
+        part["pending"].append(table)
+        part["pending_rows"] += table.num_rows
+        if part["pending_rows"] >= ROW_GROUP_ROWS:
+            self._flush(part)
+    
+    def _finish(self) -> Dict[str, Any]:
+        """Close every open file, upload it and save the summary."""
+        for group in list(self._parts):
+            self._finish_part(group)
+        
+        saved_files = self._saved_files
+        
+        # Save summary as JSON (parquet tidak cocok untuk summary)
+        summary_filename = self.strategy._save_summary(
+            self.table_name, self.datasource_name, self.counts, self.timestamp, saved_files
+        )
+        if summary_filename:
+            saved_files.append(summary_filename)
+        
+        result = {
+            "status": "success",
+            "format": "parquet",
+            "files_saved": saved_files,
+            "total_files": len(saved_files)
+        }
+        if self.batched:
+            result["batched"] = True
+        return result
+    
+    def abort(self) -> None:
+        """Drop open files without uploading them."""
+        for part in self._parts.values():
+            part["writer"].close()
+        self._parts = {}
+    
+    def _open_part(self, group: str, schema: pa.Schema) -> Dict[str, Any]:
+        """Start a new Parquet file for a group of operations."""
+        index = self._part_counts.get(group, 0) + 1
+        self._part_counts[group] = index
+        suffix = group if index == 1 else f"{group}_part{index}"
+        
+        sink = BytesIO()
+        part = {
+            "filename": self.strategy._generate_filename(self.table_name, self.datasource_name, self.timestamp, suffix),
+            "schema": schema,
+            "sink": sink,
+            "writer": pq.ParquetWriter(sink, schema, **PARQUET_WRITE_OPTIONS),
+            "pending": [],
+            "pending_rows": 0
+        }
+        self._parts[group] = part
+        return part
+    
+    def _flush(self, part: Dict[str, Any]) -> None:
+        """Write buffered chunks of a file as one row group."""
+        if part["pending"]:
+            part["writer"].write_table(pa.concat_tables(part["pending"]))
+            part["pending"] = []
+            part["pending_rows"] = 0
+    
+    def _finish_part(self, group: str) -> None:
+        """Close a group's open file and upload it."""
+        part = self._parts.pop(group)
+        self._flush(part)
+        part["writer"].close()
+        
+        # Upload a view of the written buffer; getvalue() would copy the file
+        filename = part["filename"]
+        if self.strategy.storage_manager.store_snapshot(
+            filename, [part["sink"].getbuffer()], content_type='application/octet-stream'
+        ):
+            self._saved_files.append(filename)
+    
+    @staticmethod
+    def _conform(table: pa.Table, schema: pa.Schema) -> Optional[pa.Table]:
+        """Cast a chunk to an open file's schema.
+        
+        Columns missing from the chunk are filled with nulls.
+        
+        Returns:
+            The cast table, or None if the chunk does not fit the schema
+        """
+        if not set(table.column_names) <= set(schema.names):
+            return None
+        
+        try:
+            columns = [
+                table[field.name].cast(field.type) if field.name in table.column_names
+                else pa.nulls(table.num_rows, type=field.type)
+                for field in schema
+            ]
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            return None
+        return pa.Table.from_arrays(columns, schema=schema)
@@ -2,6 +2,8 @@ import logging
 import datetime
 from typing import Dict, Any
 
+import pandas as pd
+
 from services.cdc_strategy import CDCStrategy
 
 logger = logging.getLogger(__name__)
@@ -10,6 +12,40 @@ logger = logging.getLogger(__name__)
 class TimestampCDCStrategy(CDCStrategy):
     """CDC strategy using timestamp-based change detection."""
     
+    def has_changes(self, table_name: str, table_config: Dict[str, Any], datasource_name: str) -> bool:
+        """Compare the stored high-watermark against a single MAX() query.
+        
+        Args:
+            table_name: Name of the table
+            table_config: Table configuration
+            datasource_name: Name of the datasource
+            
+        Returns:
+            False if the newest timestamp equals the stored watermark
+        """
+        timestamp_column = table_config.get("timestamp_column")
+        if not timestamp_column:
+            return True
+            
+        state_key = f"{datasource_name}/{table_name}/timestamp_state"
+        last_state = self.storage_manager.retrieve_state(state_key)
+        last_timestamp = last_state.get("last_timestamp") if last_state else None
+        if not last_timestamp:
+            return True
+        
+        schema = table_config.get("schema", "")
+        qualified_table_name = self.db_manager.qualified_table_name(datasource_name, table_name, schema)
+        quoted_column = self.db_manager.quote_identifier(datasource_name, timestamp_column)
+        
+        # SIMPLE MAX query - satu baris, pakai index timestamp
+        max_query = f"SELECT MAX({quoted_column}) AS max_ts FROM {qualified_table_name}"
+        result = self.db_manager.execute_query(datasource_name, max_query)
+        row = result.fetchone() if result is not None else None
+        if not row or row[0] is None:
+            return False
+        
+        return str(row[0]) != last_timestamp
+    
     def process(self, table_name: str, table_config: Dict[str, Any], datasource_name: str) -> Dict[str, Any]:
         """Process a table using timestamp-based CDC method.
         
@@ -30,30 +66,35 @@ class TimestampCDCStrategy(CDCStrategy):
         last_state = self.storage_manager.retrieve_state(state_key)
         last_timestamp = last_state.get("last_timestamp") if last_state else None
         
-        # Get changes since last timestamp
+        # Get changes since last timestamp, bound as a parameter
         where_clause = None
+        params = None
         if last_timestamp:
-            where_clause = f"{timestamp_column} > '{last_timestamp}'"
+            quoted_column = self.db_manager.quote_identifier(datasource_name, timestamp_column)
+            where_clause = f"{quoted_column} > :last_timestamp"
+            params = {"last_timestamp": last_timestamp}
             
-        # Process data in batches
-        changes = []
-        latest_timestamp = last_timestamp
+        # Process data in batches; batches are kept as DataFrames
+        change_frames = []
+        latest_value = None
         
         for batch in self.db_manager.fetch_data_in_batches(
-            datasource_name, table_name, where_clause=where_clause
+            datasource_name, table_name, where_clause=where_clause, params=params
         ):
             if batch.empty:
                 continue
                 
-            # Track the latest timestamp
+            # Track the latest timestamp as a value; it is only turned into
+            # the state's string once the scan is done
             if timestamp_column in batch.columns:
-                batch_max_timestamp = str(batch[timestamp_column].max())
-                if not latest_timestamp or batch_max_timestamp > latest_timestamp:
-                    latest_timestamp = batch_max_timestamp
+                batch_max = batch[timestamp_column].max()
+                if not pd.isna(batch_max) and (latest_value is None or batch_max > latest_value):
+                    latest_value = batch_max
             
-            # Convert batch to dictionaries for processing
-            records = batch.to_dict("records")
-            changes.extend(records)
+            change_frames.append(batch)
+        
+        changes = self._concat_frames(change_frames)
+        latest_timestamp = str(latest_value) if latest_value is not None else last_timestamp
         
         # Store the latest timestamp as the new state
         if latest_timestamp and latest_timestamp != last_timestamp:
@@ -0,0 +1,44 @@
+"""Round trips through the format handlers."""
+
+import pytest
+
+from utils.formats import ArrowIpcFormatHandler, JsonFormatHandler, ParquetFormatHandler
+from utils.formats.json_format import COMPRESS_MIN_BYTES, ZSTD_MAGIC
+
+RAGGED_RECORDS = [
+    {"a": 1},
+    {"a": 2, "b": "x"},
+    {"b": "y", "c": 3.5}
+]
+
+
+def _read_back(handler, payload):
+    data_stream, _, _, _ = handler.store(payload)
+    return handler.retrieve(data_stream.read())
+
+
+@pytest.mark.parametrize("handler", [ParquetFormatHandler, ArrowIpcFormatHandler])
+def test_ragged_records_keep_every_key(handler):
+    result = _read_back(handler, {"data": RAGGED_RECORDS, "table_name": "users"})
+    
+    assert result["table_name"] == "users"
+    assert result["data"] == [
+        {"a": 1, "b": None, "c": None},
+        {"a": 2, "b": "x", "c": None},
+        {"a": None, "b": "y", "c": 3.5}
+    ]
+
+
+@pytest.mark.parametrize("handler", [ParquetFormatHandler, ArrowIpcFormatHandler])
+def test_empty_records_round_trip(handler):
+    assert _read_back(handler, {"data": []})["data"] == []
+
+
+def test_large_json_is_compressed_and_read_back():
+    payload = {"data": [{"id": index, "name": "user"} for index in range(COMPRESS_MIN_BYTES // 10)]}
+    data_stream, _, content_type, _ = JsonFormatHandler.store(payload, compress=True)
+    data_bytes = data_stream.read()
+    
+    assert content_type == 'application/zstd'
+    assert data_bytes.startswith(ZSTD_MAGIC)
+    assert JsonFormatHandler.retrieve(data_bytes) == payload
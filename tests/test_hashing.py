@@ -0,0 +1,79 @@
+"""Row hashing and reading stored row hash states."""
+
+import json
+import sqlite3
+from functools import partial
+
+import pytest
+
+from utils.database import DatabaseManager
+from utils.hashing import (
+    HASH_DTYPE_BACKEND, HASH_STATE_VERSION, calculate_row_hash, get_hasher, hash_frame, 
+    load_row_hashes, resolve_hash_columns
+)
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    database = tmp_path / "source.db"
+    with sqlite3.connect(database) as conn:
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, n INTEGER, name TEXT)")
+        conn.executemany("INSERT INTO items VALUES (?, ?, ?)", [(1, 5, "a"), (2, 6, "b"), (3, None, "c"), (4, 8, "d")])
+    
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({"datasources": {"src": {"url": f"sqlite:///{database}"}}, "tables": {}}))
+    manager = DatabaseManager(str(config_path))
+    yield manager
+    manager.close_all_connections()
+
+
+def _row_hashes(db_manager, where_clause):
+    _, hasher = get_hasher("xxh3_64")
+    hashes = {}
+    for batch in db_manager.fetch_data_in_batches("src", "items", where_clause=where_clause, dtype_backend=HASH_DTYPE_BACKEND):
+        row_columns = resolve_hash_columns(["*"], batch.columns)
+        hashes.update(zip(batch["id"].tolist(), hash_frame(batch, row_columns, hasher)))
+    return hashes
+
+
+def test_row_hash_does_not_depend_on_nulls_in_its_batch(db_manager):
+    with_null = _row_hashes(db_manager, "id >= 3")
+    without_null = _row_hashes(db_manager, "id = 4")
+    
+    assert with_null[4] == without_null[4]
+
+
+def test_null_values_hash_as_empty_text(db_manager):
+    _, hasher = get_hasher("xxh3_64")
+    expected = calculate_row_hash({"id": 3, "n": None, "name": "c"}, ("id", "n", "name"), hasher)
+    
+    assert _row_hashes(db_manager, "id >= 3")[3] == expected
+
+
+def test_v1_upcast_integer_keys_are_restored(db_manager):
+    state = {"row_hashes": {"1.0": "ff", "-2.0": "10"}, "hash_algo": "xxh3_64"}
+    integer_keys = partial(db_manager.is_integer_column, "src", "items", "id")
+    
+    assert load_row_hashes(state, integer_keys) == {"1": 255, "-2": 16}
+
+
+def test_v1_float_keys_are_kept(db_manager):
+    with db_manager.engines["src"].begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE prices (price REAL PRIMARY KEY, label TEXT)")
+    state = {"row_hashes": {"1.0": "ff", "2.0": "10"}, "hash_algo": "md5"}
+    integer_keys = partial(db_manager.is_integer_column, "src", "prices", "price")
+    
+    assert load_row_hashes(state, integer_keys) == {"1.0": "ff", "2.0": "10"}
+    assert load_row_hashes(state) == {"1.0": "ff", "2.0": "10"}
+
+
+def test_v1_keys_are_kept_unless_all_were_upcast():
+    state = {"row_hashes": {"1.0": "ff", "a": "10"}, "hash_algo": "md5"}
+    
+    assert load_row_hashes(state, lambda: True) == {"1.0": "ff", "a": "10"}
+
+
+def test_current_states_are_read_as_stored():
+    state = {"row_hashes": {"1.0": 5}, "state_version": HASH_STATE_VERSION}
+    
+    assert load_row_hashes(state, lambda: True) == {"1.0": 5}
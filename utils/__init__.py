@@ -0,0 +1 @@
+"""Database, storage and serialization helpers."""
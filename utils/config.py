@@ -0,0 +1,48 @@
+"""Configuration file loading shared by the CLI, the DAGs and the managers."""
+
+import mmap
+import os
+from functools import lru_cache
+from typing import Dict, Any
+
+from utils.serialization import json_loads
+
+
+@lru_cache(maxsize=8)
+def _load_config_cached(config_path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Parse the configuration file once per (path, mtime, size) revision.
+    
+    The stat values are only part of the cache key so an edited config
+    is picked up on the next call without re-reading unchanged files.
+    The file is memory-mapped and parsed in place, so large configs are
+    not first copied into a bytes object.
+    """
+    with open(config_path, "rb") as f:
+        # mmap cannot map an empty file; let the parser report it
+        if not size:
+            return json_loads(f.read())
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return json_loads(view)
+            finally:
+                # The mapping cannot close while a view is still exported
+                view.release()
+
+
+def read_config(config_path: str) -> Dict[str, Any]:
+    """Read configuration from JSON file, reusing the cached parse if unchanged.
+    
+    Args:
+        config_path: Path to the configuration file
+        
+    Returns:
+        Configuration as a dictionary (shared, do not mutate)
+        
+    Raises:
+        OSError: If the file cannot be accessed
+        json.JSONDecodeError: If the file is not valid JSON
+    """
+    stat = os.stat(config_path)
+    return _load_config_cached(config_path, stat.st_mtime_ns, stat.st_size)
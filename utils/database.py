@@ -1,12 +1,44 @@
 import logging
-import json
-from typing import Dict, Any, Optional, Generator
+import re
+from typing import Dict, Any, Optional, Generator, Union
 import pandas as pd
-from sqlalchemy import create_engine, inspect, text, MetaData
+from sqlalchemy import create_engine, inspect, text, MetaData, Integer
 from sqlalchemy.engine import Engine, Connection
+from sqlalchemy.engine.reflection import Inspector
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.elements import TextClause
+
+from utils.config import read_config
+
+try:
+    import connectorx
+except ImportError:
+    connectorx = None
 
 logger = logging.getLogger(__name__)
 
+# Datasource "reader" setting that reads full-table scans with connectorx
+CONNECTORX_READER = "connectorx"
+
+# Identifiers left unquoted, so they keep the database's case folding
+_PLAIN_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _nullable_types_mapper():
+    """Map Arrow integer, boolean and float types to pandas nullable dtypes."""
+    import pyarrow as pa
+    
+    nullable = {
+        pa.int8(): pd.Int8Dtype(), pa.int16(): pd.Int16Dtype(), 
+        pa.int32(): pd.Int32Dtype(), pa.int64(): pd.Int64Dtype(), 
+        pa.uint8(): pd.UInt8Dtype(), pa.uint16(): pd.UInt16Dtype(), 
+        pa.uint32(): pd.UInt32Dtype(), pa.uint64(): pd.UInt64Dtype(), 
+        pa.bool_(): pd.BooleanDtype(), pa.float32(): pd.Float32Dtype(), 
+        pa.float64(): pd.Float64Dtype()
+    }
+    return nullable.get
+
+
 class DatabaseManager:
     """Database manager for CDC operations using SQLAlchemy with simple SELECT queries."""
     
@@ -20,15 +52,15 @@ class DatabaseManager:
         self.config = self._load_config()
         self.global_settings = self.config.get("global_settings", {})
         self.engines: Dict[str, Engine] = {}
+        self._inspectors: Dict[str, Inspector] = {}
         self.metadata = MetaData()
         self._initialize_engines()
         
     def _load_config(self) -> Dict[str, Any]:
-        """Load configuration from file."""
+        """Load configuration from file, reusing the parse of an unchanged file."""
         logger.info(f"Loading configuration from {self.config_path}")
         try:
-            with open(self.config_path, 'r') as config_file:
-                return json.load(config_file)
+            return read_config(self.config_path)
         except Exception as e:
             logger.error(f"Failed to load configuration: {str(e)}")
             raise
@@ -43,8 +75,12 @@ class DatabaseManager:
                 logger.info(f"Initializing engine for datasource: {name}")
                 url = config["url"]
                 
+                # Explicit QueuePool: managers are long-lived and shared across
+                # tables, so connections must be reused rather than re-opened
                 engine = create_engine(
                     url,
+                    poolclass=QueuePool,
+                    pool_pre_ping=True,
                     pool_size=pool_settings.get("pool_size", 5),
                     max_overflow=pool_settings.get("max_overflow", 10),
                     pool_timeout=pool_settings.get("timeout", 30)
@@ -61,14 +97,66 @@ class DatabaseManager:
             return engine.connect()
         return None
     
+    def get_dialect(self, datasource_name: str) -> Optional[str]:
+        """Get the SQL dialect name (e.g. postgresql, mysql) of a datasource."""
+        engine = self.engines.get(datasource_name)
+        return engine.dialect.name if engine else None
+    
+    def quote_identifier(self, datasource_name: str, name: str) -> str:
+        """Quote a table, schema or column name for use in a datasource's SQL.
+        
+        Plain names are returned as they are, so `Users` still means
+        `users` on PostgreSQL. Reserved words and names with any other
+        characters are quoted by the dialect, so a configured name cannot
+        break or extend the statement it is placed in. Names configured
+        with their quotes already in place are left alone.
+        
+        Args:
+            datasource_name: Name of the datasource
+            name: Identifier from the configuration
+            
+        Returns:
+            Identifier ready to be placed in SQL text
+        """
+        engine = self.engines.get(datasource_name)
+        if not engine:
+            return name
+        
+        preparer = engine.dialect.identifier_preparer
+        if _PLAIN_IDENTIFIER.match(name) and name.lower() not in preparer.reserved_words:
+            return name
+        if (
+            len(name) > 2 and name.startswith(preparer.initial_quote) and 
+            name.endswith(preparer.final_quote) and preparer.final_quote not in name[1:-1]
+        ):
+            return name
+        return preparer.quote_identifier(name)
+    
+    def qualified_table_name(self, datasource_name: str, table_name: str, schema: Optional[str] = None) -> str:
+        """Quoted table name, prefixed with its quoted schema if one is set."""
+        quoted_table = self.quote_identifier(datasource_name, table_name)
+        if not schema:
+            return quoted_table
+        return f"{self.quote_identifier(datasource_name, schema)}.{quoted_table}"
+    
     def get_table_info(self, datasource_name: str, table_name: str) -> Dict[str, Any]:
-        """Get table schema information."""
+        """Get table schema information.
+        
+        The Inspector is created once per datasource; creating one checks
+        a connection out of the pool, which pings the database. Its
+        reflection cache is cleared on every call, since managers outlive
+        a run and a table may be altered between runs.
+        """
         engine = self.engines.get(datasource_name)
         if not engine:
             logger.error(f"Datasource {datasource_name} not found")
             return {}
             
-        inspector = inspect(engine)
+        inspector = self._inspectors.get(datasource_name)
+        if inspector is None:
+            inspector = self._inspectors.setdefault(datasource_name, inspect(engine))
+        inspector.info_cache.clear()
+        
         columns = inspector.get_columns(table_name)
         pk_constraint = inspector.get_pk_constraint(table_name)
         primary_keys = pk_constraint.get('constrained_columns', [])
@@ -78,14 +166,65 @@ class DatabaseManager:
             "primary_keys": primary_keys
         }
     
+    def is_integer_column(
+        self, 
+        datasource_name: str, 
+        table_name: str, 
+        column_name: str, 
+        schema: Optional[str] = None
+    ) -> bool:
+        """Whether a table's column is declared with an integer type.
+        
+        Returns False if the column cannot be found or reflected.
+        """
+        engine = self.engines.get(datasource_name)
+        if not engine:
+            logger.error(f"Datasource {datasource_name} not found")
+            return False
+        
+        inspector = self._inspectors.get(datasource_name)
+        if inspector is None:
+            inspector = self._inspectors.setdefault(datasource_name, inspect(engine))
+        inspector.info_cache.clear()
+        
+        try:
+            columns = inspector.get_columns(table_name, schema=schema or None)
+        except Exception as e:
+            logger.warning(f"Could not reflect {table_name} on {datasource_name}: {str(e)}")
+            return False
+        
+        for column in columns:
+            if column["name"].lower() == column_name.lower():
+                return isinstance(column["type"], Integer)
+        return False
+    
     def fetch_data_in_batches(
         self, 
         datasource_name: str, 
         table_name: str, 
         batch_size: Optional[int] = None,
-        where_clause: Optional[str] = None
+        where_clause: Optional[str] = None, 
+        params: Optional[Dict[str, Any]] = None, 
+        dtype_backend: Optional[str] = None
     ) -> Generator[pd.DataFrame, None, None]:
         """Fetch data from table in batches using pandas with SIMPLE SELECT queries.
+        
+        The query runs on a server-side cursor (`stream_results`), so
+        drivers such as psycopg2 and PyMySQL hand rows over as batches are
+        read instead of buffering the whole table client-side first.
+        Dialects without server-side cursors fetch as before.
+        
+        Values in `where_clause` should be `:name` placeholders bound
+        through `params`, so the statement text stays the same from run
+        to run and values are never spliced into the SQL.
+        
+        Datasources configured with `"reader": "connectorx"` read queries
+        without parameters through connectorx, which decodes rows straight
+        into Arrow columns; see `_fetch_with_connectorx`.
+        
+        With `dtype_backend="numpy_nullable"` integer and boolean columns
+        keep their type in batches holding NULLs, which are read as
+        missing values instead of turning the column into floats.
         """
         if batch_size is None:
             batch_size = self.global_settings.get("batch_size", 10000)
@@ -100,7 +239,7 @@ class DatabaseManager:
         schema = table_config.get("schema", "") if table_config else ""
         
         # Build fully qualified table name with schema if present
-        qualified_table_name = f"{schema}.{table_name}" if schema else table_name
+        qualified_table_name = self.qualified_table_name(datasource_name, table_name, schema)
         
         # SIMPLE SELECT * query - no computation di database level
         query = f"SELECT * FROM {qualified_table_name}"
@@ -109,14 +248,64 @@ class DatabaseManager:
             
         logger.info(f"Fetching data from {datasource_name}.{qualified_table_name} in batches of {batch_size}")
         logger.info(f"Query: {query}")
+        if params:
+            logger.info(f"Parameters: {params}")
+        
+        if not params and self._uses_connectorx(datasource_name):
+            yield from self._fetch_with_connectorx(engine, query, batch_size, dtype_backend)
+            return
+        
+        read_options = {"dtype_backend": dtype_backend} if dtype_backend else {}
         
         # Use pandas to handle the batching - pandas akan handle chunking
         try:
-            for chunk in pd.read_sql(query, engine, chunksize=batch_size):
-                yield chunk
+            with engine.connect() as conn:
+                conn = conn.execution_options(stream_results=True, max_row_buffer=batch_size)
+                for chunk in pd.read_sql(text(query), conn, params=params, chunksize=batch_size, **read_options):
+                    yield chunk
         except Exception as e:
             logger.error(f"Error fetching data: {str(e)}")
             raise
+    
+    def _uses_connectorx(self, datasource_name: str) -> bool:
+        """Whether a datasource is configured to read scans with connectorx."""
+        datasource_config = self.config.get("datasources", {}).get(datasource_name, {})
+        if datasource_config.get("reader") != CONNECTORX_READER:
+            return False
+        if connectorx is None:
+            logger.warning(f"connectorx is not installed, reading {datasource_name} with pandas")
+            return False
+        return True
+    
+    def _fetch_with_connectorx(
+        self, 
+        engine: Engine, 
+        query: str, 
+        batch_size: int, 
+        dtype_backend: Optional[str] = None
+    ) -> Generator[pd.DataFrame, None, None]:
+        """Read a query with connectorx and yield it in batches.
+        
+        connectorx fetches and decodes rows in Rust, skipping the Python
+        objects `pd.read_sql` builds for every value, but it returns the
+        whole result at once: the Arrow table is held in memory and only
+        its slices are converted to pandas. Column dtypes follow Arrow
+        rather than the DB-API driver, so switching a table's datasource
+        to this reader can report its rows as modified once.
+        """
+        # connectorx takes plain backend URLs (postgresql://, mysql://)
+        url = engine.url.set(drivername=engine.url.get_backend_name()).render_as_string(hide_password=False)
+        
+        try:
+            table = connectorx.read_sql(url, query, return_type="arrow")
+        except Exception as e:
+            logger.error(f"Error fetching data with connectorx: {str(e)}")
+            raise
+        
+        # Arrow integer and boolean columns stay nullable instead of float
+        types_mapper = _nullable_types_mapper() if dtype_backend == "numpy_nullable" else None
+        for start in range(0, table.num_rows, batch_size):
+            yield table.slice(start, batch_size).to_pandas(types_mapper=types_mapper)
             
     def execute_query(self, datasource_name: str, query: str, params: Optional[Dict] = None) -> Any:
         """Execute a raw SQL query on the datasource.
@@ -142,6 +331,37 @@ class DatabaseManager:
                 logger.error(f"Error executing query: {str(e)}")
                 raise
     
+    def read_query(
+        self, 
+        datasource_name: str, 
+        query: Union[str, TextClause], 
+        params: Optional[Dict] = None, 
+        dtype_backend: Optional[str] = None
+    ) -> Optional[pd.DataFrame]:
+        """Execute a raw SQL query and return the result as a DataFrame.
+        
+        Columns come back as arrays instead of per-row tuples, so callers
+        can work on the result column-wise. Callers running one query many
+        times may pass a prebuilt `text()` statement. `dtype_backend` is
+        passed to `pd.read_sql`, as in `fetch_data_in_batches`.
+        """
+        engine = self.engines.get(datasource_name)
+        if not engine:
+            logger.error(f"Datasource {datasource_name} not found")
+            return None
+        
+        logger.info(f"Reading query on {datasource_name}: {query}")
+        
+        if isinstance(query, str):
+            query = text(query)
+        
+        try:
+            read_options = {"dtype_backend": dtype_backend} if dtype_backend else {}
+            return pd.read_sql(query, engine, params=params, **read_options)
+        except Exception as e:
+            logger.error(f"Error reading query: {str(e)}")
+            raise
+    
     def get_table_config(self, table_name: str) -> Optional[Dict[str, Any]]:
         """Get configuration for a specific table."""
         tables_config = self.config.get("tables", {})
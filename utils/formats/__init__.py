@@ -2,14 +2,18 @@
 
 from .base import FormatHandler
 from .json_format import JsonFormatHandler
-from .parquet_format import ParquetFormatHandler
+from .parquet_format import ParquetFormatHandler, PARQUET_WRITE_OPTIONS
 from .csv_format import CsvFormatHandler
+from .arrow_format import ArrowIpcFormatHandler
+from .rowhash_format import RowHashFormatHandler, NPZ_MAGIC
 
 # Register all format handlers
 FORMAT_HANDLERS = {
     "json": JsonFormatHandler,
     "parquet": ParquetFormatHandler,
-    "csv": CsvFormatHandler
+    "csv": CsvFormatHandler,
+    "arrow": ArrowIpcFormatHandler,
+    "rowhash": RowHashFormatHandler
 }
 
 __all__ = [
@@ -17,5 +21,9 @@ __all__ = [
     'JsonFormatHandler', 
     'ParquetFormatHandler', 
     'CsvFormatHandler',
+    'ArrowIpcFormatHandler',
+    'RowHashFormatHandler',
+    'NPZ_MAGIC',
+    'PARQUET_WRITE_OPTIONS',
     'FORMAT_HANDLERS'
 ]
@@ -35,3 +35,15 @@ class FormatHandler:
             Deserialized data dictionary
         """
         raise NotImplementedError("Subclasses must implement retrieve method")
+
+    @staticmethod
+    def needs_metadata(data_bytes: bytes) -> bool:
+        """Check whether retrieving this data needs its `_metadata` object
+        
+        Args:
+            data_bytes: Raw bytes data
+            
+        Returns:
+            True if the metadata object should be fetched and passed to `retrieve`
+        """
+        return False
@@ -1,11 +1,12 @@
 """CSV format handler implementation."""
 
-import json
 import logging
 import pandas as pd
-from io import BytesIO, StringIO
+from io import BytesIO
 from typing import Dict, Any, Tuple, Optional
 
+from utils.serialization import json_dumps, json_loads
+
 from .base import FormatHandler
 from .json_format import JsonFormatHandler
 
@@ -30,22 +31,27 @@ class CsvFormatHandler(FormatHandler):
         if "data" in data and isinstance(data["data"], list):
             # Extract metadata
             metadata = {k: v for k, v in data.items() if k != "data"}
-            metadata_str = json.dumps(metadata)
-            metadata_bytes = metadata_str.encode('utf-8')
+            metadata_bytes = json_dumps(metadata)
             metadata_stream = BytesIO(metadata_bytes)
             
-            # Convert data list to DataFrame and then to CSV
+            # Convert data list to DataFrame and then to CSV, encoded
+            # straight into the upload buffer without an intermediate str
             df = pd.DataFrame(data["data"])
-            csv_buffer = StringIO()
-            df.to_csv(csv_buffer, index=False)
-            csv_bytes = csv_buffer.getvalue().encode('utf-8')
-            csv_stream = BytesIO(csv_bytes)
+            csv_stream = BytesIO()
+            df.to_csv(csv_stream, index=False, encoding='utf-8')
+            csv_size = csv_stream.tell()
+            csv_stream.seek(0)
             
-            return csv_stream, len(csv_bytes), 'text/csv', (metadata_stream, len(metadata_bytes))
+            return csv_stream, csv_size, 'text/csv', (metadata_stream, len(metadata_bytes))
         else:
             # Fallback to JSON for non-data payloads
             logger.warning("Cannot convert to CSV: data is not in expected format")
-            return JsonFormatHandler.store(data)
+            return JsonFormatHandler.store(data, **kwargs)
+    
+    @staticmethod
+    def needs_metadata(data_bytes: bytes) -> bool:
+        """CSV files keep everything but the rows in their metadata object"""
+        return True
     
     @staticmethod
     def retrieve(data_bytes: bytes, metadata_bytes: Optional[bytes] = None, **kwargs) -> Dict[str, Any]:
@@ -64,7 +70,7 @@ class CsvFormatHandler(FormatHandler):
         
         # Add metadata if available
         if metadata_bytes:
-            metadata = json.loads(metadata_bytes.decode('utf-8'))
+            metadata = json_loads(metadata_bytes)
             result.update(metadata)
         
         return result
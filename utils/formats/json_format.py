@@ -1,28 +1,54 @@
 """JSON format handler implementation."""
 
-import json
+from functools import lru_cache
 from io import BytesIO
 from typing import Dict, Any, Tuple, Optional
 
+from utils.serialization import json_dumps, json_loads
+
 from .base import FormatHandler
 
+# Leading bytes of a zstd frame
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Compressed JSON is only written from this size up; smaller documents
+# stay plain so they remain readable in the bucket
+COMPRESS_MIN_BYTES = 64 * 1024
+
+
+@lru_cache(maxsize=1)
+def _zstd_codec():
+    """Create the zstd codec on first use, so plain JSON never loads pyarrow."""
+    import pyarrow as pa
+    return pa.Codec("zstd", compression_level=3)
+
 
 class JsonFormatHandler(FormatHandler):
-    """Handler for JSON format"""
+    """Handler for JSON format
+    
+    Large documents can be stored zstd compressed; CDC states repeat the
+    same keys on every entry and typically shrink by an order of
+    magnitude. Compressed and plain documents are both read back.
+    """
     
     @staticmethod
-    def store(data: Dict[str, Any], **kwargs) -> Tuple[BytesIO, int, str, None]:
+    def store(data: Dict[str, Any], compress: bool = False, **kwargs) -> Tuple[Any, int, str, None]:
         """Store data as JSON
         
         Args:
             data: Data to store
+            compress: Compress documents of at least COMPRESS_MIN_BYTES with zstd
             **kwargs: Additional keyword arguments
             
         Returns:
             Tuple of (data_stream, size, content_type, metadata)
         """
-        data_str = json.dumps(data)
-        data_bytes = data_str.encode('utf-8')
+        data_bytes = json_dumps(data)
+        if compress and len(data_bytes) >= COMPRESS_MIN_BYTES:
+            import pyarrow as pa
+            compressed = _zstd_codec().compress(data_bytes)
+            return pa.BufferReader(compressed), compressed.size, 'application/zstd', None
+        
         data_stream = BytesIO(data_bytes)
         return data_stream, len(data_bytes), 'application/json', None
     
@@ -37,5 +63,8 @@ class JsonFormatHandler(FormatHandler):
         Returns:
             Deserialized JSON data
         """
-        data_str = data_bytes.decode('utf-8')
-        return json.loads(data_str)
+        if data_bytes.startswith(ZSTD_MAGIC):
+            # The frame is read as a stream, which needs no decompressed size
+            import pyarrow as pa
+            data_bytes = pa.CompressedInputStream(pa.BufferReader(data_bytes), "zstd").read()
+        return json_loads(data_bytes)
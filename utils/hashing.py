@@ -0,0 +1,491 @@
+"""Row fingerprint helpers for the hash-based CDC strategies."""
+
+import hashlib
+import logging
+import operator
+import re
+from functools import partial
+from itertools import repeat
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import infer_dtype
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+logger = logging.getLogger(__name__)
+
+# Non-cryptographic and much faster than MD5; change detection needs no more.
+# Its 64-bit integer digests are stored as integers, not hex strings
+DEFAULT_HASH_ALGO = "xxh3_64"
+
+# Algorithm of states written before the algorithm was recorded
+LEGACY_HASH_ALGO = "md5"
+
+# Hashes whole batches with pandas.util.hash_pandas_object into 64-bit ints
+PANDAS_HASH_ALGO = "pandas"
+
+# Version of the row hash states written by this module. Version 2 stores
+# 64-bit xxhash digests as integers; version 1 stored them as hex strings
+HASH_STATE_VERSION = 2
+
+# pandas dtype backend hashed scans are read with. Nullable dtypes keep a
+# column's type whether or not a batch holds a NULL, so an INTEGER column
+# is not read as float in some batches and rendered "5.0" there
+HASH_DTYPE_BACKEND = "numpy_nullable"
+
+# Returns a fresh hash object with update() and hexdigest() or intdigest();
+# None selects the vectorized pandas hash
+Hasher = Optional[Callable[[], Any]]
+
+# hashlib constructor and parameters per algorithm name
+_HASHLIB_ALGOS = {
+    "md5": ("md5", {}),
+    "sha1": ("sha1", {}),
+    "sha256": ("sha256", {}),
+    "blake2b": ("blake2b", {}),
+    "blake2b_128": ("blake2b", {"digest_size": 16}),
+}
+_XXHASH_ALGOS = ("xxh3_64", "xxh3_128", "xxh64")
+_INT_DIGEST_ALGOS = ("xxh3_64", "xxh64")
+
+# Integer primary key as `iterrows()` rendered it after upcasting to float
+_UPCAST_INT_KEY = re.compile(r"-?\d+\.0")
+
+# Inferred types of object columns whose values str() renders the same
+# whether or not they are boxed to native Python types first
+_NATIVE_TEXT_TYPES = frozenset((
+    "string", "empty", "bytes", "integer", "boolean", "decimal", "date", "datetime", "time"
+))
+
+# One-shot digest functions of xxhash constructors; they skip creating a
+# hash object per row
+_ONE_SHOT_DIGESTS = {
+    xxhash.xxh3_64: xxhash.xxh3_64_intdigest,
+    xxhash.xxh64: xxhash.xxh64_intdigest,
+    xxhash.xxh3_128: xxhash.xxh3_128_hexdigest,
+} if xxhash is not None else {}
+
+
+def get_hasher(algo: str) -> Tuple[str, Hasher]:
+    """Resolve a hash algorithm name to a hash object constructor.
+
+    xxhash algorithms fall back to MD5 when the xxhash package is not
+    installed; the returned name is the algorithm actually used. hashlib
+    algorithms are created with `usedforsecurity=False`, which keeps MD5
+    and SHA-1 available on FIPS-mode OpenSSL builds; change detection is
+    not a security use.
+
+    Args:
+        algo: Algorithm name (xxh3_128, xxh3_64, xxh64, md5, sha1, sha256,
+            blake2b, blake2b_128, pandas)
+
+    Returns:
+        Tuple of (algorithm name, hash constructor or None for pandas)
+
+    Raises:
+        ValueError: If the algorithm is not supported
+    """
+    algo = algo.lower()
+    
+    if algo == PANDAS_HASH_ALGO:
+        return algo, None
+
+    if algo in _XXHASH_ALGOS:
+        if xxhash is not None:
+            return algo, getattr(xxhash, algo)
+        logger.warning(f"xxhash is not installed, using {LEGACY_HASH_ALGO} instead of {algo}")
+        algo = LEGACY_HASH_ALGO
+
+    if algo in _HASHLIB_ALGOS:
+        constructor, params = _HASHLIB_ALGOS[algo]
+        return algo, partial(getattr(hashlib, constructor), usedforsecurity=False, **params)
+
+    raise ValueError(f"Unsupported hash algorithm: {algo}")
+
+
+def resolve_hash_columns(hash_columns: List[str], columns: Iterable[str]) -> Tuple[str, ...]:
+    """Resolve the ordered columns that make up a row hash.
+    
+    Computed once per batch so the row loop does not re-sort or re-check
+    the column list for every row.
+    
+    Args:
+        hash_columns: Configured hash columns; "*" selects all columns
+        columns: Columns present in the fetched rows
+        
+    Returns:
+        Column names in hashing order
+    """
+    # Special case: if hash_columns contains "*", use all columns
+    if "*" in hash_columns:
+        return tuple(sorted(columns))
+    
+    available = set(columns)
+    return tuple(col for col in hash_columns if col in available)
+
+
+def calculate_row_hash(row_dict: Dict[str, Any], row_columns: Tuple[str, ...], hasher: Hasher) -> str:
+    """Calculate hash value for a row based on specified columns.
+
+    IMPORTANT: Hash calculation dilakukan di BACKEND (Python level),
+    bukan di database level untuk menghindari query yang berat.
+
+    Values are fed to the hash object one column at a time, separated by
+    "|", which digests the same bytes as joining them first without
+    building the joined string. 64-bit xxhash digests are returned as
+    integers, wider digests as hex strings.
+    
+    Args:
+        row_dict: Row data as dictionary
+        row_columns: Column names from `resolve_hash_columns`
+        hasher: Hash constructor from `get_hasher`
+
+    Returns:
+        Hash integer or string
+    """
+    row_hash = hasher()
+    separator = b""
+
+    for col in row_columns:
+        # Convert to string and handle None values
+        row_hash.update(separator)
+        row_hash.update(_text(row_dict[col]).encode('utf-8', 'surrogatepass'))
+        separator = b"|"
+
+    if row_hash.digest_size == 8 and hasattr(row_hash, "intdigest"):
+        return row_hash.intdigest()
+    return row_hash.hexdigest()
+
+
+def _text(value: Any) -> str:
+    """Text of a value as hashed by `calculate_row_hash`; NULLs of any kind are empty."""
+    if value is None or value is pd.NA or value is pd.NaT:
+        return ""
+    if isinstance(value, float) and value != value:
+        return ""
+    return str(value)
+
+
+def primary_key_texts(series: pd.Series) -> np.ndarray:
+    """Render a primary key column as state keys, with NULL keys as "".
+    
+    Rows with an empty key are skipped by the strategies, so NULL keys do
+    not turn into "None" or "nan" keys that collide with each other.
+    """
+    keys = np.array(series.astype(str).tolist(), dtype=str)
+    keys[series.isna().to_numpy()] = ""
+    return keys
+
+
+def _vectorized_texts(series: pd.Series) -> Optional[List[str]]:
+    """Convert a column to text in one numpy pass, if numpy renders it like str().
+    
+    Covers integer, boolean and float64 columns, numpy or nullable, naive
+    timestamps without fractional seconds, and object columns whose values
+    need no boxing (strings, Decimals, dates). NULLs are empty whatever the
+    dtype. Returns None for any other column.
+    """
+    dtype = series.dtype
+    if not isinstance(dtype, np.dtype):
+        # Nullable integer, boolean and float columns carry their numpy dtype
+        numpy_dtype = getattr(dtype, "numpy_dtype", None)
+        if numpy_dtype is None or not (numpy_dtype.kind in "iub" or numpy_dtype == np.float64):
+            return None
+        missing = series.isna().to_numpy()
+        return _blank(series.to_numpy(dtype=numpy_dtype, na_value=0).astype(str).tolist(), missing)
+    
+    values = series.to_numpy()
+    if dtype == object:
+        if infer_dtype(values, skipna=True) in _NATIVE_TEXT_TYPES:
+            return list(map(_text, values.tolist()))
+        return None
+    
+    if dtype.kind in "iub":
+        return values.astype(str).tolist()
+    
+    if dtype == np.float64:
+        return _blank(values.astype(str).tolist(), np.isnan(values))
+    
+    if dtype == np.dtype("datetime64[ns]"):
+        missing = np.isnat(values)
+        if (values[~missing].view(np.int64) % 1_000_000_000).any():
+            return None
+        texts = list(map(str.replace, np.datetime_as_string(values, unit="s").tolist(), repeat("T"), repeat(" ")))
+        return _blank(texts, missing)
+    
+    return None
+
+
+def _blank(texts: List[str], missing: np.ndarray) -> List[str]:
+    """Empty the texts of missing values in place."""
+    for position in np.flatnonzero(missing).tolist():
+        texts[position] = ""
+    return texts
+
+
+def hash_frame(df: pd.DataFrame, row_columns: Tuple[str, ...], hasher: Hasher) -> List[Any]:
+    """Calculate the hashes of every row in a batch.
+    
+    With the pandas algorithm the batch is hashed in one vectorized pass.
+    Its digests depend on column dtypes, so a column that switches type
+    between runs (e.g. integers gaining a NULL and turning float) reports
+    its rows as modified once.
+    
+    Other algorithms work column by column: numeric and timestamp columns
+    are converted to text by numpy, plain object columns straight from
+    their values, the rest value by value, then rows are
+    joined with "|" and every row is hashed in a single call. The digests
+    are the same as `calculate_row_hash`, and NULLs hash as "" in any
+    dtype. A value's text still follows its column's dtype, so batches
+    should be read with HASH_DTYPE_BACKEND: an INTEGER column with a NULL
+    in the batch is then not read as float.
+    
+    Args:
+        df: Batch of rows
+        row_columns: Column names from `resolve_hash_columns`
+        hasher: Hash constructor from `get_hasher`
+        
+    Returns:
+        Row hashes in the order of the batch
+    """
+    if df.empty:
+        return []
+    
+    if hasher is None:
+        return pd.util.hash_pandas_object(df[list(row_columns)], index=False).to_numpy().tolist()
+    
+    column_texts = {col: _vectorized_texts(df[col]) for col in row_columns}
+    
+    # to_dict boxes values like the per-row records did, so str() matches
+    remaining = [col for col, texts in column_texts.items() if texts is None]
+    if remaining:
+        for col, values in df[remaining].to_dict("list").items():
+            column_texts[col] = list(map(_text, values))
+    
+    texts = [column_texts[col] for col in row_columns]
+    rows = map("|".join, zip(*texts)) if texts else [""] * len(df)
+    
+    encoded = map(str.encode, rows, repeat('utf-8'), repeat('surrogatepass'))
+    
+    one_shot = _ONE_SHOT_DIGESTS.get(hasher)
+    if one_shot is not None:
+        return list(map(one_shot, encoded))
+    
+    probe = hasher()
+    if probe.digest_size == 8 and hasattr(probe, "intdigest"):
+        digest = lambda data: hasher(data).intdigest()
+    else:
+        digest = lambda data: hasher(data).hexdigest()
+    return list(map(digest, encoded))
+
+
+def load_row_hashes(
+    state: Optional[Dict[str, Any]], 
+    integer_keys: Optional[Callable[[], bool]] = None
+) -> Dict[str, Any]:
+    """Read the row hashes of a stored state in the current state version.
+    
+    Version 1 states stored 64-bit xxhash digests as hex strings; they are
+    converted to the integers `calculate_row_hash` now returns, which are
+    the same digests, so an upgrade does not report rows as modified.
+    
+    Version 1 states were also hashed from `iterrows()` rows, which upcast
+    integers to float when every column is numeric and some are float, so
+    their keys read "1.0" where primary keys are now "1". Keys of such
+    states are converted back when `integer_keys` confirms the primary key
+    column is an integer type, so the upgrade does not report every row
+    as deleted and added again. Float and NUMERIC keys read as floats
+    still render as "1.0" and are left alone. The digests were taken over
+    the upcast text and cannot be recomputed, so rows with integer hash
+    columns are reported as modified once.
+    
+    Args:
+        state: Stored state, or None
+        integer_keys: Tells whether the primary key column is an integer
+            type; only called for version 1 states whose keys all look
+            upcast. Keys are left as stored without it
+        
+    Returns:
+        Row hashes keyed by primary key
+    """
+    if not state:
+        return {}
+    
+    row_hashes = state.get("row_hashes", {})
+    if not row_hashes or state.get("state_version", 1) >= 2:
+        return row_hashes
+    
+    # Only a state whose every key is an upcast integer had its keys upcast
+    if integer_keys is not None and all(map(_UPCAST_INT_KEY.fullmatch, row_hashes)) and integer_keys():
+        row_hashes = {pk[:-2]: digest for pk, digest in row_hashes.items()}
+    
+    if (
+        state.get("hash_algo", LEGACY_HASH_ALGO) in _INT_DIGEST_ALGOS and 
+        isinstance(next(iter(row_hashes.values())), str)
+    ):
+        return {pk: int(digest, 16) for pk, digest in row_hashes.items()}
+    return row_hashes
+
+
+def digest_array(digests: List[Any]) -> np.ndarray:
+    """Hold row hashes as a uint64 array when they are integers, else as objects."""
+    if digests and isinstance(digests[0], int):
+        return np.array(digests, dtype=np.uint64)
+    array = np.empty(len(digests), dtype=object)
+    array[:] = digests
+    return array
+
+
+def resolve_hashers(hash_algo: str, previous_algo: Optional[str]) -> Tuple[str, Hasher, Hasher]:
+    """Resolve the hash functions for one CDC run.
+
+    Rows are stored under `hash_algo`, but are compared with the algorithm
+    that produced the previous state, so switching algorithms does not
+    report every row as modified. The run after a switch hashes each row
+    with both.
+
+    Args:
+        hash_algo: Configured algorithm name
+        previous_algo: Algorithm recorded in the previous state, or None if
+            there is no previous state
+
+    Returns:
+        Tuple of (algorithm name to record, hasher for storing, hasher for comparing)
+
+    Raises:
+        ValueError: If the configured algorithm is not supported
+    """
+    hash_algo, hasher = get_hasher(hash_algo)
+
+    if previous_algo is None or previous_algo == hash_algo:
+        return hash_algo, hasher, hasher
+
+    logger.info(f"Hash algorithm changed from {previous_algo} to {hash_algo}, comparing with {previous_algo} for this run")
+    _, previous_hasher = get_hasher(previous_algo)
+    return hash_algo, hasher, previous_hasher
+
+
+def _int_keys(keys: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Primary keys as int64 values, with a mask of the keys that are canonical integers.
+    
+    Keys such as "007", "1.0" or "+1" are not canonical; their value in
+    the returned array is meaningless.
+    """
+    try:
+        ints = np.fromiter(map(int, keys), dtype=np.int64, count=len(keys))
+    except (ValueError, OverflowError, TypeError):
+        # Some keys are not 64-bit integers at all; convert them one by one
+        ints = np.zeros(len(keys), dtype=np.int64)
+        for position, key in enumerate(keys):
+            try:
+                ints[position] = int(key)
+            except (ValueError, OverflowError, TypeError):
+                pass
+    
+    texts = list(map(str, ints.tolist()))
+    if texts == keys:
+        return ints, np.ones(len(keys), dtype=bool)
+    return ints, np.fromiter(map(operator.eq, texts, keys), dtype=bool, count=len(keys))
+
+
+def _key_hashes(keys: List[str]) -> np.ndarray:
+    """64-bit xxh3 digests of string primary keys."""
+    encoded = map(str.encode, keys, repeat('utf-8'), repeat('surrogatepass'))
+    return np.fromiter(map(xxhash.xxh3_64_intdigest, encoded), dtype=np.uint64, count=len(keys))
+
+
+class RowHashIndex:
+    """Previous row hashes held as sorted arrays for vectorized lookups.
+    
+    Digests are a uint64 or object array. Keys are an int64 array when
+    every primary key is a canonical integer, 8 bytes per key with no
+    string objects. Other keys stay an object array of the strings the
+    dict held, sorted by their 64-bit xxh3 digest so a batch is searched
+    on integers and only the matched keys are compared as strings. (A
+    fixed-width string array would take 4 bytes times the longest key for
+    every key, which for UUID or free-text keys is more than the dict.)
+    The index remembers which keys were seen so the deleted ones can be
+    listed at the end of a scan.
+    """
+    
+    def __init__(self, row_hashes: Dict[str, Any]):
+        """Build the index from a row hash map.
+        
+        Args:
+            row_hashes: Row hashes keyed by primary key, from `load_row_hashes`
+        """
+        key_list = list(row_hashes)
+        digests = digest_array(list(row_hashes.values()))
+        self._key_hashes = None
+        
+        ints, canonical = _int_keys(key_list)
+        self._int_keyed = bool(canonical.all())
+        if self._int_keyed:
+            keys = ints
+            order = np.argsort(keys, kind="stable")
+        else:
+            keys = np.empty(len(key_list), dtype=object)
+            keys[:] = key_list
+            order = None
+            if xxhash is not None:
+                hashes = _key_hashes(key_list)
+                order = np.argsort(hashes, kind="stable")
+                self._key_hashes = hashes[order]
+                # Two keys sharing a digest could not both be found; search the strings instead
+                if (self._key_hashes[1:] == self._key_hashes[:-1]).any():
+                    self._key_hashes = order = None
+            if order is None:
+                order = np.argsort(keys, kind="stable")
+        
+        self._keys = keys[order]
+        self._digests = digests[order]
+        self._seen = np.zeros(len(self._keys), dtype=bool)
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def classify(self, keys: np.ndarray, digests: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """Match a batch of rows against the index and mark their keys seen.
+        
+        Args:
+            keys: Primary keys of the batch as a string array
+            digests: Row hashes of the batch, from the previous state's algorithm
+            
+        Returns:
+            Tuple of (added mask, modified mask) over the batch
+        """
+        if not len(self._keys):
+            return np.ones(len(keys), dtype=bool), np.zeros(len(keys), dtype=bool)
+        
+        key_list = keys.tolist() if isinstance(keys, np.ndarray) else list(keys)
+        if self._int_keyed:
+            # Keys that are not canonical integers cannot be in the index
+            keys, searchable = _int_keys(key_list)
+            positions = np.searchsorted(self._keys, keys)
+        else:
+            keys = np.empty(len(key_list), dtype=object)
+            keys[:] = key_list
+            searchable = True
+            if self._key_hashes is not None:
+                positions = np.searchsorted(self._key_hashes, _key_hashes(key_list))
+            else:
+                positions = np.searchsorted(self._keys, keys)
+        
+        positions[positions == len(self._keys)] = 0
+        found = searchable & (self._keys[positions] == keys)
+        matched = positions[found]
+        self._seen[matched] = True
+        
+        modified = np.zeros(len(keys), dtype=bool)
+        modified[found] = self._digests[matched] != np.array(digests, dtype=self._digests.dtype)[found]
+        return ~found, modified
+    
+    def unseen(self) -> List[str]:
+        """Keys that no classified batch contained."""
+        unseen = self._keys[~self._seen].tolist()
+        return list(map(str, unseen)) if self._int_keyed else unseen
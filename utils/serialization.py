@@ -0,0 +1,53 @@
+"""JSON encoding helpers backed by orjson, with a stdlib fallback."""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Serialize values the JSON encoders do not handle natively."""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if hasattr(obj, "item"):
+        # numpy scalar types
+        return obj.item()
+    return str(obj)
+
+
+def json_dumps(data: Any) -> bytes:
+    """Serialize data to UTF-8 encoded JSON bytes.
+
+    Args:
+        data: Data to serialize
+
+    Returns:
+        JSON document as bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(data, default=_default).encode('utf-8')
+
+
+def json_loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """Deserialize a JSON document.
+
+    Args:
+        data: JSON document as bytes or str
+
+    Returns:
+        Deserialized data
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = bytes(data).decode('utf-8')
+    return json.loads(data)
@@ -1,14 +1,73 @@
 import logging
-import json
-from typing import Dict, Any, Optional, List
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from io import BytesIO
+from typing import Dict, Any, Optional, List, Tuple, Union
 
+import certifi
+import urllib3
 from minio import Minio
+from minio.deleteobjects import DeleteObject
 from minio.error import S3Error
 
-from utils.formats import FORMAT_HANDLERS
+from utils.formats import FORMAT_HANDLERS, NPZ_MAGIC, RowHashFormatHandler
+from utils.config import read_config
 
 logger = logging.getLogger(__name__)
 
+# Multipart part sizes for large uploads. minio defaults to 5 MiB parts,
+# which turns a large snapshot into hundreds of requests; parts are kept
+# between these bounds and are uploaded by minio's parallel uploader
+MIN_UPLOAD_PART_SIZE = 16 * 1024 * 1024
+MAX_UPLOAD_PART_SIZE = 64 * 1024 * 1024
+
+# Parts per object at which the part size starts growing past the minimum
+UPLOAD_PART_COUNT = 16
+
+# Connections kept open to the object store. minio's own pool keeps 10,
+# fewer than parallel page writes each uploading parts in parallel use
+DEFAULT_MAX_CONNECTIONS = 32
+
+
+def _upload_part_size(length: int) -> int:
+    """Multipart part size for an upload of `length` bytes.
+    
+    Objects up to the minimum part size go up in a single request.
+    """
+    return min(max(MIN_UPLOAD_PART_SIZE, length // UPLOAD_PART_COUNT), MAX_UPLOAD_PART_SIZE)
+
+
+class _PartsReader:
+    """File-like reader over a list of byte strings.
+    
+    Lets an object encoded in parts be uploaded without first joining
+    them into one copy; each part is released once it has been read.
+    """
+    
+    def __init__(self, parts: List[bytes]):
+        self._parts = parts
+        self._index = 0
+        self._offset = 0
+    
+    def read(self, size: int = -1) -> bytes:
+        """Read up to `size` bytes, or everything left if size is negative."""
+        chunks = []
+        while self._index < len(self._parts) and size != 0:
+            part = self._parts[self._index]
+            end = len(part) if size < 0 else min(len(part), self._offset + size)
+            chunks.append(part[self._offset:end])
+            if size > 0:
+                size -= end - self._offset
+            if end == len(part):
+                self._parts[self._index] = None
+                self._index += 1
+                self._offset = 0
+            else:
+                self._offset = end
+        return b"".join(chunks)
+
+
 class StorageManager:
     """Storage manager for CDC state using MinIO/S3."""
     
@@ -21,15 +80,15 @@ class StorageManager:
         self.config_path = config_path
         self.config = self._load_config()
         self.storage_config = self.config.get("storage", {})
+        self._default_handler, self._snapshot_handlers = self._resolve_format_handlers()
         self.client = self._initialize_client()
         self._ensure_bucket_exists()
         
     def _load_config(self) -> Dict[str, Any]:
-        """Load configuration from file."""
+        """Load configuration from file, reusing the parse of an unchanged file."""
         logger.info(f"Loading configuration from {self.config_path}")
         try:
-            with open(self.config_path, 'r') as config_file:
-                return json.load(config_file)
+            return read_config(self.config_path)
         except Exception as e:
             logger.error(f"Failed to load configuration: {str(e)}")
             raise
@@ -52,11 +111,32 @@ class StorageManager:
                 endpoint,
                 access_key=access_key,
                 secret_key=secret_key,
-                secure=secure
+                secure=secure,
+                http_client=self._build_http_client()
             )
         except Exception as e:
             logger.error(f"Failed to initialize MinIO client: {str(e)}")
             return None
+    
+    def _build_http_client(self) -> urllib3.PoolManager:
+        """Build the connection pool shared by every request of the client.
+        
+        Timeouts, certificate checks and retries are minio's defaults; only
+        the number of connections kept open is raised (`max_connections`).
+        """
+        timeout = 5 * 60
+        return urllib3.PoolManager(
+            timeout=urllib3.Timeout(connect=timeout, read=timeout),
+            maxsize=self.storage_config.get("max_connections", DEFAULT_MAX_CONNECTIONS),
+            block=False,
+            cert_reqs='CERT_REQUIRED',
+            ca_certs=os.environ.get('SSL_CERT_FILE') or certifi.where(),
+            retries=urllib3.Retry(
+                total=5,
+                backoff_factor=0.2,
+                status_forcelist=[500, 502, 503, 504]
+            )
+        )
             
     def _ensure_bucket_exists(self) -> None:
         """Ensure the configured bucket exists."""
@@ -77,30 +157,89 @@ class StorageManager:
         except S3Error as e:
             logger.error(f"Error checking/creating bucket {bucket}: {str(e)}")
     
+    @staticmethod
+    def _handler_for(format_type: str):
+        """Look up the handler class of a format, falling back to JSON."""
+        handler_class = FORMAT_HANDLERS.get(format_type)
+        if not handler_class:
+            logger.warning(f"Unknown format type: {format_type}, falling back to JSON")
+            handler_class = FORMAT_HANDLERS["json"]
+        return handler_class
+            
+    def _resolve_format_handlers(self) -> Tuple[type, Dict[str, type]]:
+        """Resolve the configured format handlers once.
+        
+        Returns:
+            Tuple of (default handler, handlers keyed by table name for
+            tables with their own `snapshot_format`)
+        """
+        # Get format type (default is JSON)
+        default_handler = self._handler_for(self.storage_config.get("format", "json").lower())
+        
+        snapshot_handlers = {
+            table_name: self._handler_for(table_config["snapshot_format"].lower())
+            for table_name, table_config in self.config.get("tables", {}).items()
+            if "snapshot_format" in table_config
+        }
+        return default_handler, snapshot_handlers
+    
     def _get_format_handler(self, state_key: str):
         """Get the appropriate format handler based on configuration."""
         # Check if this is a snapshot and has table-specific format preference
-        table_format = None
         if "/snapshot" in state_key:
             # Extract table name from state_key (format: datasource/table_name/snapshot)
-            parts = state_key.split("/")
-            if len(parts) >= 2:
-                table_name = parts[1]
-                tables_config = self.config.get("tables", {})
-                if table_name in tables_config and "snapshot_format" in tables_config[table_name]:
-                    table_format = tables_config[table_name]["snapshot_format"].lower()
-                    logger.info(f"Using table-specific format {table_format} for {state_key}")
+            table_name = state_key.partition("/")[2].partition("/")[0]
+            return self._snapshot_handlers.get(table_name, self._default_handler)
         
-        # Get format type (default is JSON)
-        format_type = table_format or self.storage_config.get("format", "json").lower()
+        return self._default_handler
+    
+    def _put_with_metadata(
+        self, 
+        bucket: str, 
+        object_key: str, 
+        data_stream: Any, 
+        data_size: int, 
+        content_type: str, 
+        metadata_tuple: Optional[Tuple[Any, int]] = None
+    ) -> None:
+        """Upload an object and, if the handler produced one, its `_metadata` object.
         
-        # Return appropriate handler
-        handler_class = FORMAT_HANDLERS.get(format_type)
-        if not handler_class:
-            logger.warning(f"Unknown format type: {format_type}, falling back to JSON")
-            handler_class = FORMAT_HANDLERS["json"]
-            
-        return handler_class
+        The two uploads run concurrently, so a paired write costs one
+        round-trip of wall-clock time rather than two.
+        
+        Args:
+            bucket: Bucket to upload to
+            object_key: Key of the main object
+            data_stream: Stream of the main object
+            data_size: Size of the main object in bytes
+            content_type: Content type of the main object
+            metadata_tuple: Optional (stream, size) of the metadata object
+        """
+        upload_data = partial(
+            self.client.put_object,
+            bucket,
+            object_key,
+            data=data_stream,
+            length=data_size,
+            content_type=content_type,
+            part_size=_upload_part_size(data_size)
+        )
+        if metadata_tuple is None:
+            upload_data()
+            return
+        
+        metadata_stream, metadata_size = metadata_tuple
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="metadata-upload") as executor:
+            metadata_upload = executor.submit(
+                self.client.put_object,
+                bucket,
+                f"{object_key}_metadata",
+                data=metadata_stream,
+                length=metadata_size,
+                content_type='application/json'
+            )
+            upload_data()
+            metadata_upload.result()
     
     def store_state(self, state_key: str, data: Dict[str, Any]) -> bool:
         """Store CDC state data in MinIO.
@@ -121,39 +260,23 @@ class StorageManager:
             logger.error("Bucket name not specified in configuration")
             return False
         
-        # Get appropriate format handler
-        handler = self._get_format_handler(state_key)
+        # Row hash states are packed into arrays regardless of the configured format
+        if "row_hashes" in data:
+            handler = RowHashFormatHandler
+        else:
+            handler = self._get_format_handler(state_key)
         logger.info(f"Using {handler.__name__} for storing state {state_key}")
         
         try:
-            # Store the data using the format handler
-            result = handler.store(data)
+            # Store the data using the format handler; large JSON states are compressed
+            result = handler.store(data, compress=True)
             
             # Unpack the results - main data stream, size, content type, and optional metadata
-            if len(result) == 4 and result[3] is not None:
-                data_stream, data_size, content_type, metadata_tuple = result
-                metadata_stream, metadata_size = metadata_tuple
+            data_stream, data_size, content_type = result[:3]
+            metadata_tuple = result[3] if len(result) == 4 else None
                 
-                # Store metadata
-                metadata_key = f"{state_key}_metadata"
-                self.client.put_object(
-                    bucket,
-                    metadata_key,
-                    data=metadata_stream,
-                    length=metadata_size,
-                    content_type='application/json'
-                )
-            else:
-                data_stream, data_size, content_type = result[:3]
-            
-            # Store main data
-            self.client.put_object(
-                bucket,
-                state_key,
-                data=data_stream,
-                length=data_size,
-                content_type=content_type
-            )
+            # Store main data, and metadata alongside it
+            self._put_with_metadata(bucket, state_key, data_stream, data_size, content_type, metadata_tuple)
             
             logger.info(f"Stored state at {bucket}/{state_key}")
             return True
@@ -184,24 +307,29 @@ class StorageManager:
         handler = self._get_format_handler(state_key)
         
         try:
-            # Check if this format uses metadata
-            metadata_bytes = None
-            try:
-                metadata_key = f"{state_key}_metadata"
-                metadata_response = self.client.get_object(bucket, metadata_key)
-                metadata_bytes = metadata_response.read()
-                metadata_response.close()
-                metadata_response.release_conn()
-            except S3Error as e:
-                if "NoSuchKey" not in str(e):
-                    raise
-            
             # Get main data
             response = self.client.get_object(bucket, state_key)
             data_bytes = response.read()
             response.close()
             response.release_conn()
             
+            # Packed row hash states are recognised by their content
+            if data_bytes.startswith(NPZ_MAGIC):
+                handler = RowHashFormatHandler
+            
+            # Only formats that keep metadata in a separate object need a second request
+            metadata_bytes = None
+            if handler.needs_metadata(data_bytes):
+                try:
+                    metadata_key = f"{state_key}_metadata"
+                    metadata_response = self.client.get_object(bucket, metadata_key)
+                    metadata_bytes = metadata_response.read()
+                    metadata_response.close()
+                    metadata_response.release_conn()
+                except S3Error as e:
+                    if "NoSuchKey" not in str(e):
+                        raise
+            
             # Use handler to retrieve data
             return handler.retrieve(data_bytes, metadata_bytes=metadata_bytes)
                 
@@ -212,11 +340,50 @@ class StorageManager:
                 logger.error(f"Error retrieving state from {bucket}/{state_key}: {str(e)}")
             return None
             
-    def list_states(self, prefix: str = "") -> List[str]:
+    def retrieve_object(self, object_key: str) -> Optional[bytes]:
+        """Retrieve the raw bytes of an object.
+        
+        Args:
+            object_key: Key of the object to retrieve
+            
+        Returns:
+            Object content or None if not found/error
+        """
+        if not self.client:
+            logger.error("MinIO client not initialized")
+            return None
+        
+        bucket = self.storage_config.get("bucket")
+        if not bucket:
+            logger.error("Bucket name not specified in configuration")
+            return None
+        
+        try:
+            response = self.client.get_object(bucket, object_key)
+            try:
+                return response.read()
+            finally:
+                response.close()
+                response.release_conn()
+        except S3Error as e:
+            if "NoSuchKey" in str(e):
+                logger.info(f"No object found at {bucket}/{object_key}")
+            else:
+                logger.error(f"Error retrieving object from {bucket}/{object_key}: {str(e)}")
+            return None
+    
+    def list_states(self, prefix: str = "", start_after: Optional[str] = None, stop_after: Optional[str] = None) -> List[str]:
         """List available state objects with a given prefix.
         
+        Objects are listed in lexicographic key order, so a key range is
+        pushed down to the listing: `start_after` is passed to the object
+        store, and listing stops at the first key past `stop_after`
+        without fetching further pages.
+        
         Args:
             prefix: Prefix to filter objects by (e.g., "table_name/")
+            start_after: Only list keys that sort after this key
+            stop_after: Stop at the first key that sorts after this key
             
         Returns:
             List of state keys
@@ -231,9 +398,16 @@ class StorageManager:
             return []
             
         try:
-            objects = self.client.list_objects(bucket, prefix=prefix, recursive=True)
-            # Filter out metadata files
-            return [obj.object_name for obj in objects if not obj.object_name.endswith("_metadata")]
+            objects = self.client.list_objects(bucket, prefix=prefix, recursive=True, start_after=start_after)
+            
+            keys = []
+            for obj in objects:
+                if stop_after is not None and obj.object_name > stop_after:
+                    break
+                # Filter out metadata files
+                if not obj.object_name.endswith("_metadata"):
+                    keys.append(obj.object_name)
+            return keys
         except S3Error as e:
             logger.error(f"Error listing states with prefix {prefix}: {str(e)}")
             return []
@@ -247,6 +421,21 @@ class StorageManager:
         Returns:
             True if successful, False otherwise
         """
+        return self.delete_states([state_key])
+    
+    def delete_states(self, state_keys: List[str]) -> bool:
+        """Delete state objects, with their metadata objects, in bulk.
+        
+        Keys are removed with multi-object delete requests of up to 1000
+        keys each rather than one request per object. Missing objects are
+        not an error.
+        
+        Args:
+            state_keys: Keys of the states to delete
+            
+        Returns:
+            True if every object was deleted, False otherwise
+        """
         if not self.client:
             logger.error("MinIO client not initialized")
             return False
@@ -256,31 +445,35 @@ class StorageManager:
             logger.error("Bucket name not specified in configuration")
             return False
             
-        try:
-            # Delete main object
-            self.client.remove_object(bucket, state_key)
-            logger.info(f"Deleted state at {bucket}/{state_key}")
-            
-            # Try to delete metadata if it exists
-            try:
-                metadata_key = f"{state_key}_metadata"
-                self.client.remove_object(bucket, metadata_key)
-                logger.info(f"Deleted metadata at {bucket}/{metadata_key}")
-            except S3Error as e:
-                if "NoSuchKey" not in str(e):
-                    logger.warning(f"Error deleting metadata: {str(e)}")
-            
+        if not state_keys:
             return True
+        
+        delete_objects = [DeleteObject(key) for key in state_keys]
+        delete_objects.extend(DeleteObject(f"{key}_metadata") for key in state_keys)
+        
+        try:
+            # remove_objects is lazy; errors are only reported while iterating
+            errors = list(self.client.remove_objects(bucket, delete_objects))
         except S3Error as e:
-            logger.error(f"Error deleting state at {bucket}/{state_key}: {str(e)}")
+            logger.error(f"Error deleting {len(state_keys)} states in {bucket}: {str(e)}")
+            return False
+            
+        for error in errors:
+            logger.error(f"Error deleting state at {bucket}/{error.name}: {error.message}")
+        if errors:
             return False
             
-    def store_snapshot(self, file_path: str, data: Dict[str, Any], content_type: str = None) -> bool:
+        logger.info(f"Deleted {len(state_keys)} states in {bucket}")
+        return True
+            
+    def store_snapshot(self, file_path: str, data: Union[Dict[str, Any], bytes, List[bytes]], content_type: str = None) -> bool:
         """Store snapshot data using the appropriate format handler.
         
         Args:
             file_path: Path/key to store the snapshot at
-            data: Data to store
+            data: Data to store, or an already encoded file as bytes (or a
+                list of byte parts, consumed by the upload) which is
+                uploaded as-is
             content_type: Optional content type override
             
         Returns:
@@ -294,12 +487,29 @@ class StorageManager:
         if not bucket:
             logger.error("Bucket name not specified in configuration")
             return False
+        
+        if isinstance(data, (bytes, bytearray, list)):
+            data_size = sum(map(len, data)) if isinstance(data, list) else len(data)
+            try:
+                self.client.put_object(
+                    bucket,
+                    file_path,
+                    data=_PartsReader(data) if isinstance(data, list) else BytesIO(data),
+                    length=data_size,
+                    content_type=content_type or 'application/octet-stream',
+                    part_size=_upload_part_size(data_size)
+                )
+                logger.info(f"Stored snapshot at {bucket}/{file_path}")
+                return True
+            except Exception as e:
+                logger.error(f"Error storing snapshot at {bucket}/{file_path}: {str(e)}")
+                return False
             
         # Determine the format from the file extension
         format_type = "json"  # Default
         if "." in file_path:
             extension = file_path.split(".")[-1].lower()
-            if extension in ["json", "parquet", "csv"]:
+            if extension in ["json", "parquet", "csv", "arrow"]:
                 format_type = extension
                 
         # Get the appropriate format handler
@@ -315,34 +525,16 @@ class StorageManager:
             result = handler_class.store(data)
             
             # Unpack the results - main data stream, size, content type, and optional metadata
-            if len(result) == 4 and result[3] is not None:
-                data_stream, data_size, default_content_type, metadata_tuple = result
-                metadata_stream, metadata_size = metadata_tuple
-                
-                # Store metadata
-                metadata_path = f"{file_path}_metadata"
-                self.client.put_object(
-                    bucket,
-                    metadata_path,
-                    data=metadata_stream,
-                    length=metadata_size,
-                    content_type='application/json'
-                )
-                logger.info(f"Stored snapshot metadata at {bucket}/{metadata_path}")
-            else:
-                data_stream, data_size, default_content_type = result[:3]
+            data_stream, data_size, default_content_type = result[:3]
+            metadata_tuple = result[3] if len(result) == 4 else None
             
             # Use provided content type or default from format handler
             content_type = content_type or default_content_type
             
-            # Store main data
-            self.client.put_object(
-                bucket,
-                file_path,
-                data=data_stream,
-                length=data_size,
-                content_type=content_type
-            )
+            # Store main data, and metadata alongside it
+            self._put_with_metadata(bucket, file_path, data_stream, data_size, content_type, metadata_tuple)
+            if metadata_tuple is not None:
+                logger.info(f"Stored snapshot metadata at {bucket}/{file_path}_metadata")
             
             logger.info(f"Stored snapshot at {bucket}/{file_path}")
             return True